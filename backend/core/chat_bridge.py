@@ -1,15 +1,31 @@
 import os
-import json
+import io
+import re
+import functools
+import math
+import asyncio
+import time
+import hashlib
+import heapq
 import logging
-from typing import List, Dict, Any, Optional
-import google.generativeai as genai
+import threading
+from collections import OrderedDict, deque
+from operator import itemgetter, mul
+from typing import List, Dict, Any, Optional, AsyncIterator, Union
 try:
     from PIL import Image
-    import io
     PIL_AVAILABLE = True
 except ImportError:
     PIL_AVAILABLE = False
 
+# Candidate pre-filter ranks int8-quantized vectors with one matrix-vector product when numpy is installed
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from . import fastjson
 from .graph_logic import Weaver
 
 logger = logging.getLogger(__name__)
@@ -17,6 +33,446 @@ logger = logging.getLogger(__name__)
 if not PIL_AVAILABLE:
     logger.warning("PIL/Pillow not available. Image analysis will be limited.")
 
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+
+def _extract_json(text: str) -> Any:
+    """
+    Parses a JSON reply from Gemini. Tries the raw text, then the body of a
+    ```json fence, then the span from the first opening to the last closing
+    bracket (replies with leading or trailing prose).
+    """
+    try:
+        return fastjson.loads(text)
+    except ValueError:
+        pass
+    match = _JSON_FENCE_RE.search(text)
+    if match:
+        try:
+            return fastjson.loads(match.group(1))
+        except ValueError:
+            pass
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    end = max(text.rfind("}"), text.rfind("]"))
+    if not starts or end < min(starts):
+        raise ValueError(f"No JSON found in model reply: {text[:80]!r}")
+    return fastjson.loads(text[min(starts):end + 1])
+
+# Rough Gemini tokenizer ratio used for input budgets
+CHARS_PER_TOKEN = 4
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cuts text to roughly max_tokens Gemini tokens (~4 characters per token).
+    Backs up to the last line or sentence break in the final quarter of the
+    window so the excerpt does not end mid-sentence.
+    """
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    head = text[:limit]
+    cut = max(head.rfind("\n"), head.rfind(". "))
+    if cut >= limit * 3 // 4:
+        head = head[:cut + 1]
+    return head
+
+# Token budgets for document excerpts sent with metadata extraction and rewrites
+METADATA_INPUT_TOKENS = 1000
+REWRITE_INPUT_TOKENS = 500
+# Token budgets for node content in expansion / abstraction and edge justification prompts
+NODE_EXCERPT_TOKENS = 250
+JUSTIFICATION_EXCERPT_TOKENS = 125
+
+GEMINI_MODEL = 'gemini-2.5-flash'
+
+# Mixed into LLM cache keys; bump when prompt wording changes
+PROMPT_VERSION = "v2"
+
+# LLM response cache bounds: entry count and lifetime (seconds)
+LLM_CACHE_SIZE = 512
+LLM_CACHE_TTL = 7 * 24 * 3600
+
+# Near-duplicate metadata cache: embedding model, entry count, cosine cut-off
+EMBEDDING_MODEL = "models/text-embedding-004"
+SEMANTIC_CACHE_SIZE = 128
+SEMANTIC_CACHE_THRESHOLD = 0.95
+# Metadata fields a near-duplicate may share; title and summary are always generated
+SEMANTIC_CACHE_FIELDS = ("module", "main_topic", "tags")
+
+# Embedding micro-batching: collection window (ms) and max texts per call
+EMBED_BATCH_WINDOW_MS = 50
+EMBED_BATCH_SIZE = 64
+
+# Vision payload budget: longest edge in pixels and JPEG quality
+VISION_MAX_EDGE = 1536
+VISION_JPEG_QUALITY = 85
+
+# Relationship detection fan-out: candidates per prompt and concurrent prompts
+RELATIONSHIP_BATCH_SIZE = 20
+RELATIONSHIP_CONCURRENCY = 8
+# Only the K candidates closest to the new node by embedding are sent to the LLM
+RELATIONSHIP_PREFILTER_K = 20
+
+# Max number of live Gemini chat sessions kept in memory
+CHAT_CACHE_SIZE = 128
+
+# Max number of cached context subgraphs
+SUBGRAPH_CACHE_SIZE = 256
+
+# Max number of cached hydrated context blocks
+HYDRATE_CACHE_SIZE = 64
+
+# Line templates for context hydration
+_NODE_LINE = "\nID: [{}] | Type: {} | Content: {}"
+_EDGE_LINE = "\nFrom [{}] -> To [{}] | Justification: {}"
+_node_fields = itemgetter("id", "type")
+_edge_fields = itemgetter("source", "target")
+_EMPTY_CONTEXT = "### CONTEXT NODES ###\n\n### JUSTIFIED EDGES (RELATIONSHIPS) ###"
+
+_SIMULATED_RESPONSE = "Simulated Response: [TICKET-101] and [SRS-PAY-02] suggest a timing issue. (LLM Key Missing)"
+
+# Gemini response schemas (OpenAPI subset) for structured JSON output
+_PROPOSED_TOPIC_SCHEMA = {
+    "type": "object",
+    "nullable": True,
+    "properties": {"name": {"type": "string"}, "description": {"type": "string"}},
+    "required": ["name", "description"],
+}
+_PROPOSED_MODULE_SCHEMA = {
+    "type": "object",
+    "nullable": True,
+    "properties": {"topic": {"type": "string"}, "name": {"type": "string"}, "description": {"type": "string"}},
+    "required": ["topic", "name", "description"],
+}
+_METADATA_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "summary": {"type": "string"},
+        "module": {"type": "string"},
+        "main_topic": {"type": "string"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "proposed_new_topic": _PROPOSED_TOPIC_SCHEMA,
+        "proposed_new_module": _PROPOSED_MODULE_SCHEMA,
+    },
+    "required": ["title", "summary", "module", "main_topic", "tags"],
+}
+_SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {"title": {"type": "string"}, "summary": {"type": "string"}},
+    "required": ["title", "summary"],
+}
+_IMAGE_SCHEMA = {
+    **_METADATA_SCHEMA,
+    "properties": {**_METADATA_SCHEMA["properties"], "content": {"type": "string"}},
+    "required": _METADATA_SCHEMA["required"] + ["content"],
+}
+_RELATIONSHIP_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "target_id": {"type": "string"},
+            "justification": {"type": "string"},
+            "confidence": {"type": "number"},
+        },
+        "required": ["target_id", "justification", "confidence"],
+    },
+}
+
+# Prompt templates, filled with str.format per call
+_METADATA_PROMPT = """
+        You are Nexus, an AI Knowledge Weaver. Analyze the following document and extract structured metadata.
+        
+        You have access to the Current Context Registry (Topics & Modules). 
+        Your goal is to fit this content into the existing structure OR propose new structure if it genuinely doesn't fit.
+
+        {registry_summary}
+
+        Input Text:
+        {content}... (truncated)
+
+        Requirements:
+        1. Title: Concise and descriptive.
+        2. Summary: One sentence explaining the core value/issue.
+        3. Module: Must be an existing Module from Registry, OR a proposed new one.
+        4. Main Topic: Must be an existing Topic from Registry, OR a proposed new one.
+        5. Tags: List of specific keywords.
+        6. Proposed new topic / module: Only when proposing new structure, otherwise null.
+        """
+
+# Used when a near-duplicate supplied the classification; title and summary stay per document
+_SUMMARY_PROMPT = """
+        You are Nexus, an AI Knowledge Weaver. Write a title and summary for the following document.
+
+        Input Text:
+        {content}... (truncated)
+
+        Requirements:
+        1. Title: Concise and descriptive.
+        2. Summary: One sentence explaining the core value/issue.
+        """
+
+_RELATIONSHIP_PROMPT = """
+        You are Nexus. A new document node has been added to the graph. 
+        Your task is to identify logical connections (edges) between this new node and existing nodes.
+
+        New Node:
+        ID: {id}
+        Title: {title}
+        Summary: {summary}
+        Tags: {tags}
+        Module: {module}
+
+        Existing Nodes (Candidates):
+        {candidates}
+
+        Instructions:
+        1. Analyze semantic relationships (e.g., shared topics, dependency, conflict, elaboration).
+        2. Create edges ONLY if there is a strong justification.
+        3. Limit to top {limit} strongest connections.
+        4. "confidence" should be between 0.0 and 1.0.
+        5. "justification" says why they are linked in at most 10 words.
+        If no connections, return [].
+        """
+
+_IMAGE_PROMPT = """
+            You are Nexus, an AI Knowledge Weaver. Analyze this image as if it were an article or document.
+            
+            You have access to the Current Context Registry (Topics & Modules).
+            Your goal is to extract all meaningful content from this image and fit it into the existing structure OR propose new structure if needed.
+            
+            {registry_summary}
+            
+            Instructions:
+            1. Extract ALL text visible in the image (OCR).
+            2. Analyze the visual content (diagrams, charts, screenshots, photos, etc.).
+            3. Understand the context and meaning of the content.
+            4. Extract structured metadata:
+               - Title: What is this image/article about?
+               - Summary: One sentence explaining the core value/issue.
+               - Content: Full text content extracted from the image, formatted as a readable article.
+               - Module: Must be an existing Module from Registry, OR a proposed new one.
+               - Main Topic: Must be an existing Topic from Registry, OR a proposed new one.
+               - Tags: List of specific keywords from the content.
+               - Proposed new topic / module: Only when proposing new structure, otherwise null.
+            """
+
+_REWRITE_PROMPT = """
+        You are Nexus. Rewrite the content and summary of the following node to better reflect its role within the graph.
+        
+        Target Node:
+        ID: {node_id}
+        Current Summary: {summary}
+        Topic: {topic}
+        Module: {module}
+        Original Content: {content}...
+        
+        Connected Context (Neighbors):
+        {neighbors}
+        
+        Instructions:
+        1. Synthesize the connected context.
+        2. Rewrite the "summary" to explicitly mention how this node relates to its neighbors.
+        3. Rewrite the "content" to integrate the context naturally, while preserving the original core information.
+        4. Tone: {tone}. Detail Level: {detail}.
+        5. If the context suggests a better "main_topic" or "module", suggest it too.
+        
+        Output JSON:
+        {{
+            "summary": "New context-aware summary...",
+            "content": "New context-enriched content...",
+            "suggested_topic": "Current or New Topic",
+            "suggested_module": "Current or New Module"
+        }}
+        """
+
+_JUSTIFICATION_PROMPT = """
+        You are Nexus. A user is manually linking two nodes. Generate a concise justification for this connection.
+        
+        Source Node:
+        Title: {source_title}
+        Summary: {source_summary}
+        Content Snippet: {source_content}
+        
+        Target Node:
+        Title: {target_title}
+        Summary: {target_summary}
+        Content Snippet: {target_content}
+        
+        User Hint (Optional): {user_hint}
+        
+        Instructions:
+        1. Determine the logical relationship (e.g., "Supports", "Contradicts", "Elaborates on", "Sub-task of").
+        2. If a User Hint is provided, use it as the core meaning but refine the phrasing.
+        3. Output ONLY the justification string (max 15 words).
+        """
+
+_MECE_PROMPT = """
+        You are Nexus. Apply the MECE (Mutually Exclusive, Collectively Exhaustive) principle to break down the following node into sub-components.
+        
+        Parent Node:
+        Title: {title}
+        Type: {node_type}
+        Topic: {topic}
+        Content: {content}...
+        
+        Instructions:
+        1. Determine the optimal number of sub-components to cover the parent concept completely without overlap.
+        2. Create AT MOST {limit} sub-components.
+        3. Use a {tone} tone for content generation.
+        4. If the parent is a 'topic', create 'module' level nodes.
+        5. If the parent is a 'module', create 'parent' level nodes.
+        6. If the parent is a 'parent', create 'child' level nodes.
+        7. For each new node, generate rich content and metadata.
+        
+        Output JSON List:
+        [
+            {{
+                "title": "Sub-component Title",
+                "summary": "Concise summary",
+                "content": "Detailed content block...",
+                "tags": ["tag1", "tag2"],
+                "node_type": "target_level (module/parent/child)",
+                "justification": "Why this is a sub-component of the parent"
+            }}
+        ]
+        """
+
+_ABSTRACTION_PROMPT = """
+        You are Nexus. Abstract the following node into a higher-level parent concept.
+        
+        Child Node:
+        Title: {title}
+        Type: {node_type}
+        Content: {content}...
+        
+        Instructions:
+        1. Identify the broader category or system this node belongs to.
+        2. Use a {tone} tone.
+        3. If the child is a 'module', create a 'topic'.
+        4. If the child is a 'parent', create a 'module'.
+        5. If the child is a 'child', create a 'parent'.
+        
+        Output JSON:
+        {{
+            "title": "Parent Concept Title",
+            "summary": "High-level summary",
+            "content": "Description of the broader system...",
+            "node_type": "target_level (topic/module/parent)",
+            "justification": "Why the child belongs to this parent"
+        }}
+        """
+
+_CHAT_SYSTEM_INSTRUCTION = (
+    "You are Nexus, an evidence-based reasoning engine.\n"
+    "You must only answer based on the provided Context Nodes. Do not use outside knowledge.\n"
+    "The LLM output MUST follow a strict citation format: [NODE-ID] whenever you reference a specific piece of information.\n"
+    "FORMATTING RULES:\n"
+    "1. Use Markdown for all responses.\n"
+    "2. Use H1 (#) for main titles, H2 (##) for sections.\n"
+    "3. Use **Bold** for key concepts.\n"
+    "4. Use tables for comparisons or structured data.\n"
+    "5. Use > Blockquotes for key insights.\n"
+    "6. Use lists and bullet points for readability.\n\n"
+)
+
+def _require_model(fallback):
+    """
+    Short-circuits an async ChatBridge method when no Gemini model is configured.
+    fallback is the return value, or a zero-argument factory for mutable ones.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(self, *args, **kwargs):
+            if not self.model:
+                logger.warning(f"Gemini model not available. Skipping {fn.__name__}.")
+                return fallback() if callable(fallback) else fallback
+            return await fn(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+class _JsonArrayItems:
+    """
+    Incremental splitter for a streamed JSON array of objects: feed() text chunks
+    as they arrive and get back each top-level object once it is complete.
+    Text before the opening bracket (e.g. a ```json fence) is ignored.
+    """
+    def __init__(self):
+        self._buf: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> List[Any]:
+        items = []
+        for ch in text:
+            if self._depth >= 2:
+                self._buf.append(ch)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = self._depth > 0
+            elif ch in "[{":
+                self._depth += 1
+                if self._depth == 2:
+                    self._buf = [ch]
+            elif ch in "]}" and self._depth:
+                self._depth -= 1
+                if self._depth == 1 and ch == "}":
+                    items.append(fastjson.loads("".join(self._buf)))
+        return items
+
+class _Batcher:
+    """
+    Coalesces concurrent submit() calls made within a short window into one
+    batch_fn(items) call. batch_fn returns one result per item, in order.
+    """
+    def __init__(self, batch_fn, window_ms: int = 50, max_batch: int = 64):
+        self._batch_fn = batch_fn
+        self._window = window_ms / 1000
+        self._max_batch = max_batch
+        self._pending: List[tuple] = []
+        self._timer = None
+        self._tasks = set()
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[:self._max_batch]
+            del self._pending[:self._max_batch]
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[tuple]):
+        try:
+            results = await self._batch_fn([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
 class ChatBridge:
     """
     The Chat Bridge
@@ -30,16 +486,43 @@ class ChatBridge:
             os.environ.get("GEMINI_API_KEY", "").strip()
         )
         self.model = None
+        self._genai = None
+        # Live Gemini chat sessions keyed by session_id (LRU)
+        self._chats: "OrderedDict[str, Any]" = OrderedDict()
+        # get_subgraph results keyed by (selection, depth, graph epoch) (LRU)
+        self._subgraph_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        # Hydrated context text keyed by (epoch, node ids, edge pairs) (LRU)
+        self._hydrate_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        # Raw Gemini JSON replies keyed by request digest: key -> (expires_at, text) (LRU)
+        self._llm_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        # Metadata replies for near-duplicate excerpts: (registry summary, unit embedding, text) (FIFO)
+        self._meta_semantic: "deque[tuple]" = deque(maxlen=SEMANTIC_CACHE_SIZE)
+        # Embedding requests from concurrent ingestions, sent as one batch call
+        self._embed_batcher = _Batcher(self._embed_batch, window_ms=EMBED_BATCH_WINDOW_MS, max_batch=EMBED_BATCH_SIZE)
+        # Embeddings being fetched, by text, so concurrent callers share one request
+        self._embeds_in_flight: Dict[str, asyncio.Future] = {}
+        # Per-thread scratch state for work run via asyncio.to_thread
+        self._tls = threading.local()
+        # Rendered registry summary: (registry, registry.version, text)
+        self._registry_summary_cache = (None, -1, "")
+        # Serialized detect_relationships candidates: node_id -> (summary dict, JSON text).
+        # Weaver replaces a node's summary dict when it changes, so identity marks staleness
+        self._candidate_json: Dict[str, tuple] = {}
+        # Node embeddings for candidate pre-filtering: node_id -> (embedded text, unit vector)
+        self._node_vectors: Dict[str, tuple] = {}
         
         logger.info(f"GEMINI_API_KEY present: {bool(self.api_key)}")
         logger.info(f"GEMINI_API_KEY length: {len(self.api_key) if self.api_key else 0}")
         
         if self.api_key:
             try:
+                # Deferred: the SDK pulls in grpc/protobuf, which graph-only cold starts never need
+                import google.generativeai as genai
+                self._genai = genai
                 genai.configure(api_key=self.api_key)
                 # Using gemini-2.5-flash as requested
-                self.model = genai.GenerativeModel('gemini-2.5-flash')
-                logger.info("ChatBridge initialized successfully with model: gemini-2.5-flash")
+                self.model = genai.GenerativeModel(GEMINI_MODEL)
+                logger.info(f"ChatBridge initialized successfully with model: {GEMINI_MODEL}")
             except Exception as e:
                 logger.error(f"Failed to configure Gemini: {e}", exc_info=True)
                 self.model = None
@@ -52,31 +535,263 @@ class ChatBridge:
                 logger.info(f"Found related env vars: {', '.join(gemini_vars)}")
             self.model = None
 
+    @staticmethod
+    def _llm_cache_key(prompt: str, image_part: Optional[Dict[str, Any]] = None) -> str:
+        digest = hashlib.sha256(f"{PROMPT_VERSION}|{GEMINI_MODEL}|".encode("utf-8"))
+        digest.update(prompt.encode("utf-8"))
+        if image_part is not None:
+            digest.update(image_part["data"])
+        return digest.hexdigest()
+
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        result = await self._genai.embed_content_async(
+            model=EMBEDDING_MODEL, content=texts, task_type="semantic_similarity"
+        )
+        return result["embedding"]
+
+    async def _embed(self, text: str) -> Optional[List[float]]:
+        """
+        Returns the L2-normalized embedding of text, or None if the call fails.
+        Concurrent calls for the same text wait on a single request.
+        """
+        pending = self._embeds_in_flight.get(text)
+        if pending is None:
+            pending = asyncio.ensure_future(self._embed_batcher.submit(text))
+            self._embeds_in_flight[text] = pending
+            pending.add_done_callback(lambda _: self._embeds_in_flight.pop(text, None))
+        try:
+            # Shielded so one cancelled caller does not cancel the shared request
+            vector = await asyncio.shield(pending)
+        except Exception as e:
+            logger.warning(f"Embedding failed: {e}")
+            return None
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+    def _semantic_lookup(self, registry_summary: str, vector: List[float]) -> Optional[str]:
+        """
+        Returns the cached classification (SEMANTIC_CACHE_FIELDS, as JSON) whose
+        excerpt is most similar to vector, if it clears SEMANTIC_CACHE_THRESHOLD
+        under the same registry.
+        """
+        best_score, best_text = SEMANTIC_CACHE_THRESHOLD, None
+        for summary, cached_vector, text in self._meta_semantic:
+            if summary != registry_summary:
+                continue
+            score = sum(map(mul, vector, cached_vector))
+            if score >= best_score:
+                best_score, best_text = score, text
+        return best_text
+
+    @staticmethod
+    def _similarity_text(node: Dict[str, Any]) -> str:
+        tags = node.get("tags") or []
+        if isinstance(tags, list):
+            tags = ", ".join(map(str, tags))
+        return f"{node.get('title', '')}\n{node.get('summary', '')}\n{tags}"
+
+    def _candidate_text(self, candidate: Dict[str, Any]) -> str:
+        entry = self._candidate_json.get(candidate["id"])
+        if entry is not None and entry[0] is candidate:
+            return entry[1]
+        text = fastjson.dumps({
+            "id": candidate["id"],
+            "title": candidate.get("title", ""),
+            "summary": candidate.get("summary", ""),
+            "tags": candidate.get("tags", [])
+        }).decode()
+        self._candidate_json[candidate["id"]] = (candidate, text)
+        return text
+
+    async def _refresh_candidate_vectors(self, candidates: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Embeds candidates whose title/summary/tags changed since they were last
+        embedded. Returns their similarity texts keyed by node id.
+        """
+        texts = {c["id"]: self._similarity_text(c) for c in candidates}
+        stale = [cid for cid, text in texts.items() if self._node_vectors.get(cid, (None,))[0] != text]
+        vectors = await asyncio.gather(*(self._embed(texts[cid]) for cid in stale))
+        for cid, vector in zip(stale, vectors):
+            if vector is not None:
+                if NUMPY_AVAILABLE:
+                    # int8 with a per-vector scale: a quarter of float32's memory
+                    vector = np.asarray(vector, dtype=np.float32)
+                    scale = float(np.abs(vector).max()) / 127 or 1.0
+                    vector = (np.round(vector / scale).astype(np.int8), scale)
+                self._node_vectors[cid] = (texts[cid], vector)
+        return texts
+
+    def auto_linking_enabled(self) -> bool:
+        """True if detect_relationships would run: a model is configured and auto-linking is on."""
+        settings = self.weaver.settings.get("auto_linking")
+        return bool(self.model and settings and settings.get("enabled", True))
+
+    async def prepare_relationship_candidates(self, candidates: List[Dict[str, Any]]):
+        """
+        Embeds the candidates detect_relationships will pre-filter, so callers can
+        overlap that work with the metadata extraction that precedes it.
+        """
+        if not self.auto_linking_enabled():
+            return
+        if len(candidates) > RELATIONSHIP_PREFILTER_K:
+            await self._refresh_candidate_vectors(candidates)
+
+    async def _top_candidates(self, new_node: Dict[str, Any], candidates: List[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
+        """
+        Returns the k candidates whose title/summary/tags embed closest to new_node.
+        Candidate vectors are cached per node and re-embedded only when that text
+        changes. Falls back to all candidates if the query cannot be embedded.
+        """
+        query, texts = await asyncio.gather(
+            self._embed(self._similarity_text(new_node)), self._refresh_candidate_vectors(candidates)
+        )
+        if query is None:
+            return candidates
+
+        # Forget nodes that were deleted or belong to another canvas
+        if len(self._node_vectors) > 2 * len(texts) + k:
+            self._node_vectors = {cid: v for cid, v in self._node_vectors.items() if cid in texts}
+
+        if NUMPY_AVAILABLE:
+            rows, matrix, scales = [], [], []
+            for i, c in enumerate(candidates):
+                entry = self._node_vectors.get(c["id"])
+                if entry is not None and entry[0] == texts[c["id"]]:
+                    rows.append(i)
+                    matrix.append(entry[1][0])
+                    scales.append(entry[1][1])
+            # Not embedded: -2.0 ranks below every real cosine
+            scores = np.full(len(candidates), -2.0, dtype=np.float32)
+            if rows:
+                dots = np.stack(matrix).astype(np.float32) @ np.asarray(query, dtype=np.float32)
+                scores[rows] = dots * np.asarray(scales, dtype=np.float32)
+            # Stable, so ties keep candidate order as heapq.nlargest does
+            return [candidates[i] for i in np.argsort(-scores, kind="stable")[:k]]
+
+        def score(c: Dict[str, Any]) -> float:
+            entry = self._node_vectors.get(c["id"])
+            if entry is None or entry[0] != texts[c["id"]]:
+                return -2.0  # Not embedded; rank below every real cosine
+            return sum(map(mul, query, entry[1]))
+
+        return heapq.nlargest(k, candidates, key=score)
+
+    async def _cached_generate_json(self, prompt: str, image_part: Optional[Dict[str, Any]] = None,
+                                    ttl: float = LLM_CACHE_TTL, use_cache: bool = True,
+                                    schema: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Runs a JSON-producing Gemini call through the response cache.
+        Keyed by SHA-256 of prompt version, model, prompt and (for vision calls) image bytes;
+        each prompt template always pairs with the same schema, so it is not keyed.
+        Only replies that parse are cached; each hit is re-parsed so callers get fresh objects.
+        """
+        key = self._llm_cache_key(prompt, image_part)
+        if use_cache:
+            cached = self._llm_cache_get(key)
+            if cached is not None:
+                return _extract_json(cached)
+
+        contents = [image_part, prompt] if image_part is not None else prompt
+        text, data = await self._stream_json(contents, schema)
+        self._llm_cache_put(key, text, ttl)
+        return data
+
+    def _llm_cache_get(self, key: str) -> Optional[str]:
+        entry = self._llm_cache.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        self._llm_cache.move_to_end(key)
+        return entry[1]
+
+    def _llm_cache_put(self, key: str, text: str, ttl: float = LLM_CACHE_TTL):
+        self._llm_cache[key] = (time.monotonic() + ttl, text)
+        self._llm_cache.move_to_end(key)
+        if len(self._llm_cache) > LLM_CACHE_SIZE:
+            self._llm_cache.popitem(last=False)
+
+    async def _stream_json(self, contents: Any, schema: Optional[Dict[str, Any]] = None):
+        """
+        Streams a Gemini reply in JSON mode (constrained to schema when given) and
+        parses it as soon as the received text forms a complete JSON value.
+        Returns (text, data).
+        """
+        generation_config = {"response_mime_type": "application/json"}
+        if schema is not None:
+            generation_config["response_schema"] = schema
+        response = await self.model.generate_content_async(contents, stream=True, generation_config=generation_config)
+        chunks: List[str] = []
+        async for chunk in response:
+            chunks.append(chunk.text)
+            if chunk.text.rstrip()[-1:] in ("}", "]"):
+                text = "".join(chunks)
+                try:
+                    return text, _extract_json(text)
+                except ValueError:
+                    continue
+        text = "".join(chunks)
+        return text, _extract_json(text)
+
+    async def prewarm(self):
+        """
+        Opens the Gemini connection (DNS + TLS) ahead of the first user-facing call.
+        count_tokens is free and returns quickly.
+        """
+        if not self.model:
+            return
+        await self.model.count_tokens_async("ping")
+        logger.info("Gemini client prewarmed.")
+
+    def _registry_summary(self) -> str:
+        """
+        Returns the registry summary for prompts, re-rendered only after the
+        registry changes (version bump) or is swapped by a canvas switch.
+        """
+        registry = self.weaver.registry
+        cached_registry, version, text = self._registry_summary_cache
+        if cached_registry is registry and version == registry.version:
+            return text
+        text = registry.get_structure_summary()
+        self._registry_summary_cache = (registry, registry.version, text)
+        return text
+
     def calculate_context(self, selected_nodes: List[str], depth: int) -> Dict[str, Any]:
         """
         Calculates the blast radius and prepares context for the UI and LLM.
         """
-        subgraph = self.weaver.get_subgraph(selected_nodes, depth)
+        # Reuse the traversal for repeated selections until the graph changes
+        key = (frozenset(selected_nodes), depth, self.weaver.epoch)
+        subgraph = self._subgraph_cache.get(key)
+        if subgraph is None:
+            subgraph = self.weaver.get_subgraph(selected_nodes, depth)
+            self._subgraph_cache[key] = subgraph
+            if len(self._subgraph_cache) > SUBGRAPH_CACHE_SIZE:
+                self._subgraph_cache.popitem(last=False)
+        else:
+            self._subgraph_cache.move_to_end(key)
         
         # Calculate Dominant Module (REQ-LOG-03)
-        module_counts = {}
+        # Stop as soon as one module holds a strict majority, or none still can
         total_nodes = len(subgraph["nodes"])
-        
-        for node in subgraph["nodes"]:
-            mod = node.get("module", "Unknown")
-            module_counts[mod] = module_counts.get(mod, 0) + 1
-            
-        dominant_module = "Cross-Module"
-        if total_nodes > 0:
-            for mod, count in module_counts.items():
-                if count / total_nodes > 0.5:
-                    dominant_module = mod
+        module_counts: Dict[str, int] = {}
+        best_module, best_count = None, 0
+        for seen, node in enumerate(subgraph["nodes"], 1):
+            module = node.get("module", "Unknown")
+            count = module_counts[module] = module_counts.get(module, 0) + 1
+            if count > best_count:
+                best_module, best_count = module, count
+                if best_count * 2 > total_nodes:
                     break
+            if (best_count + total_nodes - seen) * 2 <= total_nodes:
+                break
+        
+        dominant_module = best_module if best_count * 2 > total_nodes else "Cross-Module"
                     
         return {
             "context_nodes": subgraph["nodes"],
             "context_edges": subgraph["edges"],
             "dominant_module": dominant_module,
+            # Graph epoch this snapshot was taken at (keys the hydration cache)
+            "epoch": self.weaver.epoch,
             "stats": {
                 "node_count": total_nodes,
                 "edge_count": len(subgraph["edges"])
@@ -88,81 +803,83 @@ class ChatBridge:
         Converts graph data into a text block for the System Prompt.
         REQ-LOG-02 & REQ-CHAT-01
         """
-        lines = []
-        lines.append("### CONTEXT NODES ###")
-        for node in context_data["context_nodes"]:
-            # Strip unnecessary keys (REQ-NFR-03 - simplistic implementation)
-            content = node.get("content", "")
-            lines.append(f"ID: [{node['id']}] | Type: {node['type']} | Content: {content}")
-            
-        lines.append("\n### JUSTIFIED EDGES (RELATIONSHIPS) ###")
-        for edge in context_data["context_edges"]:
-            lines.append(f"From [{edge['source']}] -> To [{edge['target']}] | Justification: {edge.get('justification', 'Linked')}")
-            
-        return "\n".join(lines)
+        nodes = context_data["context_nodes"]
+        edges = context_data["context_edges"]
+        if not nodes and not edges:
+            return _EMPTY_CONTEXT
 
+        # Same snapshot (epoch + ids) hydrates to the same text on every chat turn
+        key = (
+            context_data.get("epoch"),
+            tuple(node["id"] for node in nodes),
+            tuple((edge["source"], edge["target"]) for edge in edges)
+        )
+        cached = self._hydrate_cache.get(key)
+        if cached is not None:
+            self._hydrate_cache.move_to_end(key)
+            return cached
+
+        # Strip unnecessary keys (REQ-NFR-03 - simplistic implementation)
+        node_line, edge_line = _NODE_LINE.format, _EDGE_LINE.format
+        node_lines = [
+            node_line(node_id, node_type, node.get("content", ""))
+            for node, (node_id, node_type) in zip(nodes, map(_node_fields, nodes))
+        ]
+        edge_lines = [
+            edge_line(source, target, edge.get("justification", "Linked"))
+            for edge, (source, target) in zip(edges, map(_edge_fields, edges))
+        ]
+        text = "".join((
+            "### CONTEXT NODES ###", *node_lines,
+            "\n\n### JUSTIFIED EDGES (RELATIONSHIPS) ###", *edge_lines
+        ))
+
+        self._hydrate_cache[key] = text
+        if len(self._hydrate_cache) > HYDRATE_CACHE_SIZE:
+            self._hydrate_cache.popitem(last=False)
+        return text
+
+    @_require_model(lambda: {
+        "title": "Unknown Title", 
+        "summary": "LLM Unavailable", 
+        "tags": [],
+        "module": "General",
+        "main_topic": "Uncategorized"
+    })
     async def extract_metadata(self, content: str) -> Dict[str, Any]:
         """
         Uses Gemini to extract title, summary, module, and topics.
         Consults the ContextRegistry for two-way interaction.
         """
-        if not self.model:
-            return {
-                "title": "Unknown Title", 
-                "summary": "LLM Unavailable", 
-                "tags": [],
-                "module": "General",
-                "main_topic": "Uncategorized"
-            }
-
         # Get Registry Context
-        registry_summary = self.weaver.registry.get_structure_summary()
-
-        prompt = f"""
-        You are Nexus, an AI Knowledge Weaver. Analyze the following document and extract structured metadata.
-        
-        You have access to the Current Context Registry (Topics & Modules). 
-        Your goal is to fit this content into the existing structure OR propose new structure if it genuinely doesn't fit.
-
-        {registry_summary}
+        registry_summary = self._registry_summary()
 
-        Input Text:
-        {content[:4000]}... (truncated)
-
-        Requirements:
-        1. Title: Concise and descriptive.
-        2. Summary: One sentence explaining the core value/issue.
-        3. Module: Must be an existing Module from Registry, OR a proposed new one.
-        4. Main Topic: Must be an existing Topic from Registry, OR a proposed new one.
-        5. Tags: List of specific keywords.
-
-        Output JSON:
-        {{
-            "title": "String",
-            "summary": "String",
-            "module": "String (Existing or New)",
-            "main_topic": "String (Existing or New)",
-            "tags": ["String"],
-            "proposed_new_topic": {{ "name": "New Topic Name", "description": "Why needed" }} (Optional, null if using existing),
-            "proposed_new_module": {{ "topic": "Topic Name", "name": "New Module Name", "description": "Why needed" }} (Optional, null if using existing)
-        }}
-        """
-        
-        if not self.model:
-            logger.warning("Gemini model not available. Returning default metadata.")
-            return {
-                "title": "Untitled Document",
-                "summary": "Content ingested without AI analysis (GEMINI_API_KEY not configured)",
-                "tags": [],
-                "module": "General",
-                "main_topic": "Uncategorized"
-            }
+        excerpt = _truncate_to_tokens(content, METADATA_INPUT_TOKENS)
+        prompt = _METADATA_PROMPT.format(
+            registry_summary=registry_summary,
+            content=excerpt
+        )
         
         try:
+            # Near-duplicate excerpts reuse an earlier classification and only get a
+            # title and summary generated; exact repeats are served by the LLM cache
+            vector = None
+            if self._llm_cache_get(self._llm_cache_key(prompt)) is None:
+                vector = await self._embed(excerpt)
+                if vector is not None:
+                    cached = self._semantic_lookup(registry_summary, vector)
+                    if cached is not None:
+                        logger.info("Metadata classification served from semantic cache.")
+                        data = await self._cached_generate_json(
+                            _SUMMARY_PROMPT.format(content=excerpt), schema=_SUMMARY_SCHEMA
+                        )
+                        return {**data, **fastjson.loads(cached)}
+
             logger.info("Sending metadata extraction request to Gemini...")
-            response = await self.model.generate_content_async(prompt)
-            text = response.text.replace('```json', '').replace('```', '').strip()
-            data = json.loads(text)
+            data = await self._cached_generate_json(prompt, schema=_METADATA_SCHEMA)
+            if vector is not None:
+                classification = {field: data.get(field) for field in SEMANTIC_CACHE_FIELDS}
+                self._meta_semantic.append((registry_summary, vector, fastjson.dumps(classification).decode()))
             logger.info("Metadata extraction successful.")
             return data
         except Exception as e:
@@ -176,109 +893,74 @@ class ChatBridge:
                 "main_topic": "Uncategorized"
             }
 
-    async def analyze_image(self, image_bytes: bytes, image_format: str = "PNG") -> Dict[str, Any]:
+    def _prepare_vision_payload(self, image: Union[bytes, str, os.PathLike]):
+        """
+        Decodes and normalizes an image (raw bytes or a file path) for Gemini Vision.
+        Flattens transparency onto white, caps the longest edge at VISION_MAX_EDGE
+        (never upscaling) and re-encodes as JPEG, which keeps uploads and vision
+        token counts small. Returns (bytes, mime_type).
+        Synchronous and CPU-bound; call it from a worker thread.
         """
-        Analyzes an image using Gemini Vision API to extract content and metadata.
+        # Try to import PIL at runtime if not available at import time
+        try:
+            from PIL import Image
+        except ImportError:
+            logger.error("PIL/Pillow import failed. Attempting to install...")
+            raise ImportError("PIL/Pillow is required for image analysis. Please install it with: pip install Pillow")
+        
+        # Convert bytes to PIL Image to validate and normalize
+        pil_image = Image.open(io.BytesIO(image) if isinstance(image, (bytes, bytearray)) else image)
+        logger.info(f"Image loaded successfully. Size: {pil_image.size}, Format: {pil_image.format}, Mode: {pil_image.mode}")
+        
+        # Convert to RGB (JPEG has no alpha channel)
+        if pil_image.mode != 'RGB':
+            if pil_image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in pil_image.info:
+                # Composite onto a white background in one pass
+                rgba_image = pil_image.convert('RGBA')
+                background = Image.new('RGBA', rgba_image.size, (255, 255, 255, 255))
+                pil_image = Image.alpha_composite(background, rgba_image).convert('RGB')
+            else:
+                # Convert other modes to RGB
+                pil_image = pil_image.convert('RGB')
+        
+        # Downscale in place; thumbnail() keeps aspect ratio and never enlarges
+        pil_image.thumbnail((VISION_MAX_EDGE, VISION_MAX_EDGE), Image.Resampling.LANCZOS)
+        
+        # Per-thread output buffer, reused across calls on the same worker thread
+        image_buffer = getattr(self._tls, "image_buffer", None)
+        if image_buffer is None:
+            image_buffer = self._tls.image_buffer = io.BytesIO()
+        image_buffer.seek(0)
+        image_buffer.truncate(0)
+        pil_image.save(image_buffer, format='JPEG', quality=VISION_JPEG_QUALITY, optimize=True)
+        return image_buffer.getvalue(), "image/jpeg"
+
+    @_require_model(lambda: {
+        "title": "Image Analysis Unavailable",
+        "summary": "LLM Unavailable",
+        "content": "Image analysis requires LLM access.",
+        "tags": [],
+        "module": "General",
+        "main_topic": "Uncategorized"
+    })
+    async def analyze_image(self, image: Union[bytes, str, os.PathLike], image_format: str = "PNG") -> Dict[str, Any]:
+        """
+        Analyzes an image (raw bytes or a file path, which Pillow reads from disk)
+        using Gemini Vision API to extract content and metadata.
         Treats the image as an article/document.
         Uses Gemini Vision API (gemini-2.5-flash) for OCR and content analysis.
         """
-        if not self.model:
-            return {
-                "title": "Image Analysis Unavailable",
-                "summary": "LLM Unavailable",
-                "content": "Image analysis requires LLM access.",
-                "tags": [],
-                "module": "General",
-                "main_topic": "Uncategorized"
-            }
-
         try:
-            # Try to import PIL at runtime if not available at import time
-            try:
-                from PIL import Image
-                import io
-                pil_available = True
-            except ImportError:
-                pil_available = False
-                logger.error("PIL/Pillow import failed. Attempting to install...")
-                raise ImportError("PIL/Pillow is required for image analysis. Please install it with: pip install Pillow")
-            
-            if not pil_available:
-                raise ImportError("PIL/Pillow is required for image analysis")
-            
-            # Determine MIME type from image bytes or format
-            # Try to detect format from bytes
-            mime_type = "image/png"  # default
-            if image_bytes.startswith(b'\xff\xd8\xff'):
-                mime_type = "image/jpeg"
-            elif image_bytes.startswith(b'\x89PNG'):
-                mime_type = "image/png"
-            elif image_bytes.startswith(b'GIF'):
-                mime_type = "image/gif"
-            elif image_bytes.startswith(b'WEBP', 8):
-                mime_type = "image/webp"
-            
-            # Convert bytes to PIL Image to validate and normalize
-            pil_image = Image.open(io.BytesIO(image_bytes))
-            logger.info(f"Image loaded successfully. Size: {pil_image.size}, Format: {pil_image.format}, Mode: {pil_image.mode}")
-            
-            # Convert to RGB and save as bytes in PNG format (universally supported by Gemini)
-            if pil_image.mode != 'RGB':
-                if pil_image.mode in ('RGBA', 'LA'):
-                    # Create white background for transparency
-                    rgb_image = Image.new('RGB', pil_image.size, (255, 255, 255))
-                    if pil_image.mode == 'RGBA':
-                        rgb_image.paste(pil_image, mask=pil_image.split()[3])  # Use alpha channel as mask
-                    else:
-                        rgb_image.paste(pil_image, mask=pil_image.split()[1])  # Use alpha channel as mask
-                    pil_image = rgb_image
-                else:
-                    # Convert other modes to RGB
-                    pil_image = pil_image.convert('RGB')
-            
-            # Save as PNG bytes for Gemini
-            image_buffer = io.BytesIO()
-            pil_image.save(image_buffer, format='PNG')
-            image_bytes_final = image_buffer.getvalue()
-            mime_type = "image/png"  # Always use PNG for Gemini
+            # Pillow detects the input format; the payload is always re-encoded as JPEG.
+            # Decode/resize/encode is CPU-bound, so it runs off the event loop.
+            image_bytes_final, mime_type = await asyncio.to_thread(self._prepare_vision_payload, image)
             
             logger.info(f"Image prepared for Gemini. Size: {len(image_bytes_final)} bytes, MIME: {mime_type}")
             
             # Get Registry Context
-            registry_summary = self.weaver.registry.get_structure_summary()
-            
-            prompt = f"""
-            You are Nexus, an AI Knowledge Weaver. Analyze this image as if it were an article or document.
-            
-            You have access to the Current Context Registry (Topics & Modules).
-            Your goal is to extract all meaningful content from this image and fit it into the existing structure OR propose new structure if needed.
-            
-            {registry_summary}
-            
-            Instructions:
-            1. Extract ALL text visible in the image (OCR).
-            2. Analyze the visual content (diagrams, charts, screenshots, photos, etc.).
-            3. Understand the context and meaning of the content.
-            4. Extract structured metadata:
-               - Title: What is this image/article about?
-               - Summary: One sentence explaining the core value/issue.
-               - Content: Full text content extracted from the image, formatted as a readable article.
-               - Module: Must be an existing Module from Registry, OR a proposed new one.
-               - Main Topic: Must be an existing Topic from Registry, OR a proposed new one.
-               - Tags: List of specific keywords from the content.
+            registry_summary = self._registry_summary()
             
-            Output JSON:
-            {{
-                "title": "String (descriptive title of the image content)",
-                "summary": "String (one sentence summary)",
-                "content": "String (full extracted text content, formatted as article)",
-                "module": "String (Existing or New)",
-                "main_topic": "String (Existing or New)",
-                "tags": ["String"],
-                "proposed_new_topic": {{ "name": "New Topic Name", "description": "Why needed" }} (Optional, null if using existing),
-                "proposed_new_module": {{ "topic": "Topic Name", "name": "New Module Name", "description": "Why needed" }} (Optional, null if using existing)
-            }}
-            """
+            prompt = _IMAGE_PROMPT.format(registry_summary=registry_summary)
             
             logger.info("Sending image analysis request to Gemini Vision API (gemini-2.5-flash)...")
             # Use Gemini Vision API - pass image as dict with mime_type and data
@@ -290,9 +972,7 @@ class ChatBridge:
             
             # Use Gemini Vision API - pass image part and prompt as list
             # The library will handle the image analysis using Gemini's multimodal capabilities
-            response = await self.model.generate_content_async([image_part, prompt])
-            text = response.text.replace('```json', '').replace('```', '').strip()
-            data = json.loads(text)
+            data = await self._cached_generate_json(prompt, image_part=image_part, schema=_IMAGE_SCHEMA)
             logger.info(f"Image analysis successful. Extracted title: {data.get('title', 'Unknown')}")
             return data
         except Exception as e:
@@ -306,6 +986,7 @@ class ChatBridge:
                 "main_topic": "Uncategorized"
             }
 
+    @_require_model(list)
     async def detect_relationships(self, new_node: Dict[str, Any], candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Analyzes a new node against existing nodes to find logical connections.
@@ -320,119 +1001,128 @@ class ChatBridge:
         limit = settings.get("max_connections", 3)
         threshold = settings.get("threshold", 0.6)
 
-        if not self.model or not candidates:
+        if not candidates:
             return []
 
-        # Prepare Candidate List as Text
-        candidates_text = json.dumps([{
-            "id": c["id"], 
-            "title": c.get("title", ""), 
-            "summary": c.get("summary", ""),
-            "tags": c.get("tags", [])
-        } for c in candidates], indent=2)
+        if len(candidates) > RELATIONSHIP_PREFILTER_K:
+            candidates = await self._top_candidates(new_node, candidates, RELATIONSHIP_PREFILTER_K)
 
-        prompt = f"""
-        You are Nexus. A new document node has been added to the graph. 
-        Your task is to identify logical connections (edges) between this new node and existing nodes.
+        # Prepare Candidate Batches as Text from per-node JSON kept until that node changes
+        candidate_texts = [self._candidate_text(c) for c in candidates]
+        batches = ["[" + ",".join(candidate_texts[i:i + RELATIONSHIP_BATCH_SIZE]) + "]"
+                   for i in range(0, len(candidate_texts), RELATIONSHIP_BATCH_SIZE)]
+        # Forget nodes that were deleted or belong to another canvas
+        if len(self._candidate_json) > 2 * self.weaver.graph.number_of_nodes() + RELATIONSHIP_BATCH_SIZE:
+            self._candidate_json = {
+                cid: entry for cid, entry in self._candidate_json.items() if cid in self.weaver.graph
+            }
 
-        New Node:
-        ID: {new_node.get('id')}
-        Title: {new_node.get('title')}
-        Summary: {new_node.get('summary')}
-        Tags: {new_node.get('tags')}
-        Module: {new_node.get('module')}
+        node_fields = dict(
+            id=new_node.get('id'),
+            title=new_node.get('title'),
+            summary=new_node.get('summary'),
+            tags=new_node.get('tags'),
+            module=new_node.get('module'),
+            limit=limit
+        )
 
-        Existing Nodes (Candidates):
-        {candidates_text}
+        # Created per call so it binds to the running event loop
+        semaphore = asyncio.Semaphore(RELATIONSHIP_CONCURRENCY)
 
-        Instructions:
-        1. Analyze semantic relationships (e.g., shared topics, dependency, conflict, elaboration).
-        2. Create edges ONLY if there is a strong justification.
-        3. Limit to top {limit} strongest connections.
-        4. "confidence" should be between 0.0 and 1.0.
+        async def score_batch(candidates_text: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self._cached_generate_json(
+                    _RELATIONSHIP_PROMPT.format(candidates=candidates_text, **node_fields),
+                    schema=_RELATIONSHIP_SCHEMA
+                )
 
-        Output JSON List:
-        [
-            {{
-                "target_id": "Existing Node ID",
-                "justification": "Why they are linked (max 10 words)",
-                "confidence": 0.85
-            }}
-        ]
-        If no connections, return [].
+        logger.info(f"Detecting relationships for {new_node.get('id')} against {len(candidates)} candidates in {len(batches)} batches...")
+        results = await asyncio.gather(*(score_batch(b) for b in batches), return_exceptions=True)
+
+        links = []
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.error(f"Relationship detection batch failed: {result}", exc_info=result)
+            elif isinstance(result, list):
+                links.extend(result)
+
+        # Filter by threshold, keep the strongest links across all batches
+        filtered_links = [l for l in links if l.get("confidence", 0) >= threshold]
+        filtered_links.sort(key=lambda l: l.get("confidence", 0), reverse=True)
+        filtered_links = filtered_links[:limit]
+
+        logger.info(f"AI suggested {len(links)} links. {len(filtered_links)} passed threshold {threshold}.")
+        return filtered_links
+
+    def _get_chat(self, session_id: str, session_history: List[Dict], context_data: Dict[str, Any]):
+        """
+        Returns the cached chat session, creating it on a miss.
+        The hydrated context travels as the model's system instruction, so it is
+        sent once per request instead of being prepended to every user turn.
         """
+        chat = self._chats.get(session_id)
+        if chat is None:
+            # Construct chat history for Gemini
+            # Gemini history format: [{'role': 'user', 'parts': ['...']}, {'role': 'model', 'parts': ['...']}]
+            gemini_history = []
+            for msg in session_history:
+                role = 'user' if msg['role'] == 'user' else 'model'
+                gemini_history.append({'role': role, 'parts': [msg['content']]})
+                
+            # Create chat session on a model bound to this session's context
+            model = self._genai.GenerativeModel(
+                GEMINI_MODEL,
+                system_instruction=_CHAT_SYSTEM_INSTRUCTION + self._hydrate_context(context_data)
+            )
+            chat = model.start_chat(history=gemini_history)
+            self._chats[session_id] = chat
+            if len(self._chats) > CHAT_CACHE_SIZE:
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(session_id)
+        return chat
 
-        if not self.model:
-            logger.warning("Gemini model not available. Skipping relationship detection.")
-            return []
+    @_require_model(_SIMULATED_RESPONSE)
+    async def generate_response(self, session_id: str, session_history: List[Dict], context_data: Dict[str, Any], user_prompt: str) -> str:
+        """
+        Generates a response using Gemini 1.5 Flash.
+        The chat session is cached per session_id, so session_history is only
+        replayed when the session is not cached yet.
+        """
+        chat = self._get_chat(session_id, session_history, context_data)
         
         try:
-            logger.info(f"Detecting relationships for {new_node.get('id')} against {len(candidates)} candidates...")
-            response = await self.model.generate_content_async(prompt)
-            text = response.text.replace('```json', '').replace('```', '').strip()
-            links = json.loads(text)
-            
-            # Filter by threshold
-            filtered_links = [l for l in links if l.get("confidence", 0) >= threshold]
-            
-            logger.info(f"AI suggested {len(links)} links. {len(filtered_links)} passed threshold {threshold}.")
-            return filtered_links
+            response = await chat.send_message_async(user_prompt)
+            return response.text
         except Exception as e:
-            logger.error(f"Relationship detection failed: {e}", exc_info=True)
-            return []
+            # Drop the cached chat so the next turn rebuilds it from the session messages
+            self._chats.pop(session_id, None)
+            return f"Error communicating with Gemini: {str(e)}"
 
-    async def generate_response(self, session_history: List[Dict], context_data: Dict[str, Any], user_prompt: str) -> str:
+    async def stream_response(self, session_id: str, session_history: List[Dict], context_data: Dict[str, Any], user_prompt: str) -> AsyncIterator[str]:
         """
-        Generates a response using Gemini 1.5 Flash.
+        Streaming variant of generate_response: yields text chunks as Gemini produces them.
         """
-        hydrated_context = self._hydrate_context(context_data)
-        
-        system_instruction = (
-            "You are Nexus, an evidence-based reasoning engine.\n"
-            "You must only answer based on the provided Context Nodes. Do not use outside knowledge.\n"
-            "The LLM output MUST follow a strict citation format: [NODE-ID] whenever you reference a specific piece of information.\n"
-            "FORMATTING RULES:\n"
-            "1. Use Markdown for all responses.\n"
-            "2. Use H1 (#) for main titles, H2 (##) for sections.\n"
-            "3. Use **Bold** for key concepts.\n"
-            "4. Use tables for comparisons or structured data.\n"
-            "5. Use > Blockquotes for key insights.\n"
-            "6. Use lists and bullet points for readability.\n\n"
-            f"{hydrated_context}"
-        )
-        
         if not self.model:
-            return "Simulated Response: [TICKET-101] and [SRS-PAY-02] suggest a timing issue. (LLM Key Missing)"
-
-        # Construct chat history for Gemini
-        # Gemini history format: [{'role': 'user', 'parts': ['...']}, {'role': 'model', 'parts': ['...']}]
-        gemini_history = []
-        for msg in session_history:
-            role = 'user' if msg['role'] == 'user' else 'model'
-            gemini_history.append({'role': role, 'parts': [msg['content']]})
-            
-        # Create chat session
-        chat = self.model.start_chat(history=gemini_history)
-        
-        # Add system instruction as part of the prompt or context since 1.5 Flash API varies slightly in python lib versions
-        # Ideally system instruction is passed to GenerativeModel creation or handled via prompt engineering in the first message.
-        # For this prototype, we'll prepend context to the latest prompt to ensure it's fresh.
-        
-        full_prompt = f"{system_instruction}\n\nUser Query: {user_prompt}"
+            yield _SIMULATED_RESPONSE
+            return
+
+        chat = self._get_chat(session_id, session_history, context_data)
         
         try:
-            response = await chat.send_message_async(full_prompt)
-            return response.text
+            response = await chat.send_message_async(user_prompt, stream=True)
+            async for chunk in response:
+                yield chunk.text
         except Exception as e:
-            return f"Error communicating with Gemini: {str(e)}"
+            # Drop the cached chat so the next turn rebuilds it from the session messages
+            self._chats.pop(session_id, None)
+            yield f"Error communicating with Gemini: {str(e)}"
 
+    @_require_model("LLM Unavailable")
     async def analyze_video(self, video_url: str) -> str:
         """
         Analyzes a YouTube video URL and extracts technical details.
         """
-        if not self.model:
-            return "LLM Unavailable"
-
         prompt = "Summarize this video and extract the key technical details."
         
         try:
@@ -452,13 +1142,11 @@ class ChatBridge:
             logger.error(f"Video analysis failed: {e}", exc_info=True)
             return f"Failed to analyze video. Ensure it is public. Error: {str(e)}"
     
+    @_require_model(lambda: {"error": "LLM Unavailable"})
     async def rewrite_node_context_aware(self, node_id: str) -> Dict[str, Any]:
         """
         Rewrites a node's summary/description AND content based on its neighbors (connected nodes).
         """
-        if not self.model:
-            return {"error": "LLM Unavailable"}
-        
         # 1. Get Node Data
         node = self.weaver.graph.nodes[node_id]
         if not node:
@@ -469,17 +1157,21 @@ class ChatBridge:
         subgraph = self.weaver.get_subgraph([node_id], depth=1)
         
         # 3. Prepare Context
+        # Index the edges touching this node once, keyed by the neighbor's id
+        inbound = {e["source"]: e for e in subgraph["edges"] if e["target"] == node_id}
+        outbound = {e["target"]: e for e in subgraph["edges"] if e["source"] == node_id}
+
         neighbor_context = []
         for n in subgraph["nodes"]:
             if n["id"] == node_id: continue
             
             # Find edge justification
-            rel = "Related"
-            for e in subgraph["edges"]:
-                if e["source"] == n["id"] and e["target"] == node_id:
-                    rel = f"Influenced by {n['id']} ({e.get('justification', '')})"
-                elif e["source"] == node_id and e["target"] == n["id"]:
-                    rel = f"Influences {n['id']} ({e.get('justification', '')})"
+            if n["id"] in inbound:
+                rel = f"Influenced by {n['id']} ({inbound[n['id']].get('justification', '')})"
+            elif n["id"] in outbound:
+                rel = f"Influences {n['id']} ({outbound[n['id']].get('justification', '')})"
+            else:
+                rel = "Related"
             
             neighbor_context.append(f"- [{n['id']}] ({n.get('type')}, {n.get('main_topic')}): {n.get('summary')} | Relation: {rel}")
             
@@ -490,78 +1182,45 @@ class ChatBridge:
         tone = content_settings.get("tone", "Technical")
         detail = content_settings.get("detail_level", "High")
 
-        prompt = f"""
-        You are Nexus. Rewrite the content and summary of the following node to better reflect its role within the graph.
-        
-        Target Node:
-        ID: {node_id}
-        Current Summary: {node.get('summary', '')}
-        Topic: {node.get('main_topic', 'Uncategorized')}
-        Module: {node.get('module', 'General')}
-        Original Content: {node.get('content', '')[:2000]}...
-        
-        Connected Context (Neighbors):
-        {neighbor_text}
-        
-        Instructions:
-        1. Synthesize the connected context.
-        2. Rewrite the "summary" to explicitly mention how this node relates to its neighbors.
-        3. Rewrite the "content" to integrate the context naturally, while preserving the original core information.
-        4. Tone: {tone}. Detail Level: {detail}.
-        5. If the context suggests a better "main_topic" or "module", suggest it too.
-        
-        Output JSON:
-        {{
-            "summary": "New context-aware summary...",
-            "content": "New context-enriched content...",
-            "suggested_topic": "Current or New Topic",
-            "suggested_module": "Current or New Module"
-        }}
-        """
+        prompt = _REWRITE_PROMPT.format(
+            node_id=node_id,
+            summary=node.get('summary', ''),
+            topic=node.get('main_topic', 'Uncategorized'),
+            module=node.get('module', 'General'),
+            content=_truncate_to_tokens(node.get('content', ''), REWRITE_INPUT_TOKENS),
+            neighbors=neighbor_text,
+            tone=tone,
+            detail=detail
+        )
         
         try:
-            response = await self.model.generate_content_async(prompt)
-            text = response.text.replace('```json', '').replace('```', '').strip()
-            result = json.loads(text)
+            result = await self._cached_generate_json(prompt)
             return result
         except Exception as e:
             logger.error(f"Rewrite failed: {e}", exc_info=True)
             return {"error": str(e)}
 
+    @_require_model("Linked manually (LLM Unavailable)")
     async def generate_edge_justification(self, source_id: str, target_id: str, user_hint: Optional[str] = None) -> str:
         """
         Generates a justification for a link between two nodes.
         Used for manual connection assistance.
         """
-        if not self.model:
-            return "Linked manually (LLM Unavailable)"
-
         source = self.weaver.graph.nodes.get(source_id)
         target = self.weaver.graph.nodes.get(target_id)
         
         if not source or not target:
             return "Linked manually (Node not found)"
 
-        prompt = f"""
-        You are Nexus. A user is manually linking two nodes. Generate a concise justification for this connection.
-        
-        Source Node:
-        Title: {source.get('title', source_id)}
-        Summary: {source.get('summary', '')}
-        Content Snippet: {source.get('content', '')[:500]}
-        
-        Target Node:
-        Title: {target.get('title', target_id)}
-        Summary: {target.get('summary', '')}
-        Content Snippet: {target.get('content', '')[:500]}
-        
-        User Hint (Optional): {user_hint if user_hint else "None"}
-        
-        Instructions:
-        1. Determine the logical relationship (e.g., "Supports", "Contradicts", "Elaborates on", "Sub-task of").
-        2. If a User Hint is provided, use it as the core meaning but refine the phrasing.
-        3. Output ONLY the justification string (max 15 words).
-        """
+        prompt = _JUSTIFICATION_PROMPT.format(
+            source_title=source.get('title', source_id),
+            source_summary=source.get('summary', ''),
+            source_content=_truncate_to_tokens(source.get('content', ''), JUSTIFICATION_EXCERPT_TOKENS),
+            target_title=target.get('title', target_id),
+            target_summary=target.get('summary', ''),
+            target_content=_truncate_to_tokens(target.get('content', ''), JUSTIFICATION_EXCERPT_TOKENS),
+            user_hint=user_hint if user_hint else "None"
+        )
         
         try:
             response = await self.model.generate_content_async(prompt)
@@ -570,16 +1229,17 @@ class ChatBridge:
             logger.error(f"Edge justification generation failed: {e}")
             return user_hint if user_hint else "Linked manually"
 
-    async def generate_mece_breakdown(self, node_id: str) -> List[Dict[str, Any]]:
+    async def generate_mece_breakdown(self, node_id: str) -> AsyncIterator[Dict[str, Any]]:
         """
         Breaks down a node into MECE sub-components.
+        Yields each sub-component as soon as its JSON object has streamed in.
         """
         if not self.model:
-            return []
+            return
             
         node = self.weaver.graph.nodes.get(node_id)
         if not node:
-            return []
+            return
             
         # Get Settings
         exp_settings = self.weaver.settings.get("expansion", {})
@@ -588,52 +1248,53 @@ class ChatBridge:
         content_settings = self.weaver.settings.get("content_generation", {})
         tone = content_settings.get("tone", "Technical")
 
-        prompt = f"""
-        You are Nexus. Apply the MECE (Mutually Exclusive, Collectively Exhaustive) principle to break down the following node into sub-components.
-        
-        Parent Node:
-        Title: {node.get('title', node_id)}
-        Type: {node.get('node_type', 'unknown')}
-        Topic: {node.get('main_topic', 'Uncategorized')}
-        Content: {node.get('content', '')[:1000]}...
-        
-        Instructions:
-        1. Determine the optimal number of sub-components to cover the parent concept completely without overlap.
-        2. Create AT MOST {limit} sub-components.
-        3. Use a {tone} tone for content generation.
-        4. If the parent is a 'topic', create 'module' level nodes.
-        5. If the parent is a 'module', create 'parent' level nodes.
-        6. If the parent is a 'parent', create 'child' level nodes.
-        7. For each new node, generate rich content and metadata.
-        
-        Output JSON List:
-        [
-            {{
-                "title": "Sub-component Title",
-                "summary": "Concise summary",
-                "content": "Detailed content block...",
-                "tags": ["tag1", "tag2"],
-                "node_type": "target_level (module/parent/child)",
-                "justification": "Why this is a sub-component of the parent"
-            }}
-        ]
-        """
+        prompt = _MECE_PROMPT.format(
+            title=node.get('title', node_id),
+            node_type=node.get('node_type', 'unknown'),
+            topic=node.get('main_topic', 'Uncategorized'),
+            content=_truncate_to_tokens(node.get('content', ''), NODE_EXCERPT_TOKENS),
+            limit=limit,
+            tone=tone
+        )
         
+        key = self._llm_cache_key(prompt)
+        cached = self._llm_cache_get(key)
+        if cached is not None:
+            for item in _extract_json(cached):
+                yield item
+            return
+
         try:
-            response = await self.model.generate_content_async(prompt)
-            text = response.text.replace('```json', '').replace('```', '').strip()
-            return json.loads(text)
+            response = await self.model.generate_content_async(prompt, stream=True)
+            items = _JsonArrayItems()
+            chunks: List[str] = []
+            yielded = 0
+            async for chunk in response:
+                chunks.append(chunk.text)
+                for item in items.feed(chunk.text):
+                    yielded += 1
+                    yield item
+            text = "".join(chunks)
+            data = _extract_json(text)
+            # Reply was not a plain array of objects; fall back to the parsed whole
+            if isinstance(data, list):
+                for item in data[yielded:]:
+                    yield item
+            self._llm_cache_put(key, text)
         except Exception as e:
             logger.error(f"MECE breakdown failed: {e}")
-            return []
 
+    async def generate_mece_breakdown_list(self, node_id: str) -> List[Dict[str, Any]]:
+        """
+        List form of generate_mece_breakdown for callers that need every sub-component at once.
+        """
+        return [item async for item in self.generate_mece_breakdown(node_id)]
+
+    @_require_model(dict)
     async def generate_abstraction(self, node_id: str) -> Dict[str, Any]:
         """
         Abstracts a node into a higher-level concept.
         """
-        if not self.model:
-            return {}
-            
         node = self.weaver.graph.nodes.get(node_id)
         if not node:
             return {}
@@ -642,35 +1303,28 @@ class ChatBridge:
         content_settings = self.weaver.settings.get("content_generation", {})
         tone = content_settings.get("tone", "Technical")
 
-        prompt = f"""
-        You are Nexus. Abstract the following node into a higher-level parent concept.
-        
-        Child Node:
-        Title: {node.get('title', node_id)}
-        Type: {node.get('node_type', 'unknown')}
-        Content: {node.get('content', '')[:1000]}...
-        
-        Instructions:
-        1. Identify the broader category or system this node belongs to.
-        2. Use a {tone} tone.
-        3. If the child is a 'module', create a 'topic'.
-        4. If the child is a 'parent', create a 'module'.
-        5. If the child is a 'child', create a 'parent'.
-        
-        Output JSON:
-        {{
-            "title": "Parent Concept Title",
-            "summary": "High-level summary",
-            "content": "Description of the broader system...",
-            "node_type": "target_level (topic/module/parent)",
-            "justification": "Why the child belongs to this parent"
-        }}
-        """
+        prompt = _ABSTRACTION_PROMPT.format(
+            title=node.get('title', node_id),
+            node_type=node.get('node_type', 'unknown'),
+            content=_truncate_to_tokens(node.get('content', ''), NODE_EXCERPT_TOKENS),
+            tone=tone
+        )
         
         try:
-            response = await self.model.generate_content_async(prompt)
-            text = response.text.replace('```json', '').replace('```', '').strip()
-            return json.loads(text)
+            return await self._cached_generate_json(prompt)
         except Exception as e:
             logger.error(f"Abstraction failed: {e}")
             return {}
+
+# Process-wide bridge, reused across warm invocations so the Gemini SDK is configured once
+_BRIDGE_SINGLETON: Optional[ChatBridge] = None
+
+def get_chat_bridge(weaver: Weaver) -> ChatBridge:
+    """
+    Returns the cached ChatBridge for this weaver, creating it on first use.
+    """
+    global _BRIDGE_SINGLETON
+    bridge = _BRIDGE_SINGLETON
+    if bridge is None or bridge.weaver is not weaver:
+        bridge = _BRIDGE_SINGLETON = ChatBridge(weaver)
+    return bridge
@@ -0,0 +1,33 @@
+"""
+JSON helpers for persistence and LLM payloads.
+Backed by orjson when installed, with the stdlib json module as fallback.
+"""
+from typing import Any, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serializes obj to compact UTF-8 JSON bytes.
+    indent=True pretty-prints with two spaces, for human-edited files.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Parses JSON from bytes-like or str. Raises ValueError on malformed input."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
@@ -1,15 +1,24 @@
 import networkx as nx
-from typing import List, Dict, Set, Any, Optional
+from typing import List, Dict, Set, Any, Optional, Tuple
 import logging
-import json
 import os
+import mmap
 import shutil
 import random
+import tempfile
+import time
+import asyncio
+import queue
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+from . import fastjson
+
 # Use storage adapter for Vercel compatibility
 from .storage_adapter import (
     DATA_DIR, CANVASES_DIR, CANVAS_INDEX_FILE, SETTINGS_FILE, 
@@ -19,6 +28,130 @@ from .storage_adapter import (
 # Ensure directories exist
 ensure_dirs()
 
+# Mode for newly created data files: what open() would give under the process umask
+_umask = os.umask(0)
+os.umask(_umask)
+_DEFAULT_FILE_MODE = 0o666 & ~_umask
+
+# Fold graph.wal into graph.json once it outgrows the snapshot by this factor
+WAL_COMPACT_RATIO = 2
+# ...but never compact a WAL smaller than this (bytes)
+WAL_COMPACT_MIN_BYTES = 64 * 1024
+
+# Background WAL compactions run here one at a time, off the request path
+_compact_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="weaver-compact")
+
+# Min seconds between canvas index rewrites for last_modified during mutation bursts
+CANVAS_TOUCH_INTERVAL = 5.0
+
+def _read_json(path) -> Any:
+    """
+    Parses a JSON file straight from a read-only memory map, so the file is
+    never copied into an intermediate bytes object.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return fastjson.loads(b"")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                return fastjson.loads(view)
+            finally:
+                view.release()
+
+def _atomic_write_bytes(path, data: bytes):
+    """
+    Replaces path with data via a uniquely named sibling temp file and
+    os.replace, so readers and crashes never see a half-written file. No fsync
+    here; see _fsync_paths. The file keeps its mode, or gets the umask default.
+    """
+    path = Path(path)
+    try:
+        mode = path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        mode = _DEFAULT_FILE_MODE
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp creates the file as 0600
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _fsync_paths(paths, fds=()):
+    """
+    Flushes the given writable descriptors, closing them (pass duplicates), then
+    the given files and their directories, to stable storage. Files are opened
+    for writing because Windows refuses fsync on read-only handles, and
+    Windows cannot open a directory at all, so that step is skipped there.
+    """
+    try:
+        for fd in fds:
+            os.fsync(fd)
+    finally:
+        for fd in fds:
+            os.close(fd)
+    dirs = set()
+    for path in paths:
+        path = Path(path)
+        if path.exists():
+            fd = os.open(path, os.O_RDWR)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            dirs.add(path.parent)
+    if os.name == "nt":
+        return
+    for directory in dirs:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+# Deleted canvas dirs are renamed to <id>.trash-<ns> and removed off the request path
+TRASH_MARKER = ".trash-"
+_trash_queue: "queue.Queue[Path]" = queue.Queue()
+_trash_worker: Optional[threading.Thread] = None
+_trash_lock = threading.Lock()
+
+def _trash_loop():
+    while True:
+        path = _trash_queue.get()
+        try:
+            shutil.rmtree(path)
+        except Exception as e:
+            logger.error(f"Failed to remove trashed dir {path}: {e}")
+
+def _start_trash_worker():
+    """
+    Starts the daemon that deletes trashed dirs, once per process, and queues
+    any left behind by a previous process that exited before finishing.
+    """
+    global _trash_worker
+    with _trash_lock:
+        if _trash_worker is not None:
+            return
+        _trash_worker = threading.Thread(target=_trash_loop, name="nexus-trash", daemon=True)
+        _trash_worker.start()
+    for leftover in Path(CANVASES_DIR).glob(f"*{TRASH_MARKER}*"):
+        if leftover.is_dir():
+            _trash_queue.put(leftover)
+
+def _trash_dir(path: Path):
+    """Moves path aside with a single rename and hands it to the trash worker."""
+    trash_path = path.with_name(f"{path.name}{TRASH_MARKER}{time.time_ns()}")
+    os.rename(path, trash_path)
+    _start_trash_worker()
+    _trash_queue.put(trash_path)
+
 class SettingsRegistry:
     """
     Manages global application settings.
@@ -34,8 +167,7 @@ class SettingsRegistry:
     def _load_settings(self) -> Dict[str, Any]:
         if SETTINGS_FILE.exists():
             try:
-                with open(SETTINGS_FILE, 'r') as f:
-                    return json.load(f)
+                return _read_json(SETTINGS_FILE)
             except Exception as e:
                 logger.error(f"Failed to load settings: {e}")
         
@@ -60,8 +192,8 @@ class SettingsRegistry:
 
     def _save_settings(self, data: Dict[str, Any]):
         try:
-            with open(SETTINGS_FILE, 'w') as f:
-                json.dump(data, f, indent=2)
+            # Kept indented: settings are meant to be hand-editable
+            _atomic_write_bytes(SETTINGS_FILE, fastjson.dumps(data, indent=True))
             logger.info("Settings saved.")
         except Exception as e:
             logger.error(f"Failed to save settings: {e}")
@@ -78,6 +210,7 @@ class CanvasRegistry:
     def __init__(self):
         self._ensure_dirs()
         self.index = self._load_index()
+        _start_trash_worker()
 
     def _ensure_dirs(self):
         # Directories are ensured by storage_adapter
@@ -86,19 +219,19 @@ class CanvasRegistry:
     def _load_index(self) -> Dict[str, Any]:
         if CANVAS_INDEX_FILE.exists():
             try:
-                with open(CANVAS_INDEX_FILE, 'r') as f:
-                    return json.load(f)
+                return _read_json(CANVAS_INDEX_FILE)
             except Exception as e:
                 logger.error(f"Failed to load canvas index: {e}")
         
+        timestamp = datetime.now().isoformat()
         default_index = {
             "active_id": "default",
             "canvases": {
                 "default": {
                     "id": "default",
                     "name": "Main Canvas",
-                    "created_at": datetime.now().isoformat(),
-                    "last_modified": datetime.now().isoformat()
+                    "created_at": timestamp,
+                    "last_modified": timestamp
                 }
             }
         }
@@ -106,19 +239,12 @@ class CanvasRegistry:
         return default_index
 
     def _save_index(self, data: Dict[str, Any]):
-        with open(CANVAS_INDEX_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+        _atomic_write_bytes(CANVAS_INDEX_FILE, fastjson.dumps(data))
 
     def list_canvases(self) -> List[Dict[str, Any]]:
         # Add is_active flag to each canvas for frontend convenience
-        canvases = []
         active_id = self.get_active_id()
-        for c in self.index["canvases"].values():
-             c_copy = c.copy()
-             c_copy["is_active"] = (c["id"] == active_id)
-             canvases.append(c_copy)
-        return canvases
-        return canvases
+        return [{**c, "is_active": c["id"] == active_id} for c in self.index["canvases"].values()]
 
     def get_active_id(self) -> str:
         return self.index.get("active_id", "default")
@@ -131,30 +257,33 @@ class CanvasRegistry:
         return False
 
     def create_canvas(self, name: str) -> str:
-        canvas_id = name.lower().replace(" ", "_") + "_" + datetime.now().strftime("%H%M%S")
+        now = datetime.now()
+        timestamp = now.isoformat()
+        canvas_id = name.lower().replace(" ", "_") + "_" + now.strftime("%H%M%S")
         self.index["canvases"][canvas_id] = {
             "id": canvas_id,
             "name": name,
-            "created_at": datetime.now().isoformat(),
-            "last_modified": datetime.now().isoformat()
+            "created_at": timestamp,
+            "last_modified": timestamp
         }
         self.index["active_id"] = canvas_id 
         self._save_index(self.index)
         return canvas_id
 
-    def delete_canvas(self, canvas_id: str) -> bool:
-        if canvas_id == "default": return False 
+    def delete_canvas(self, canvas_id: str) -> Optional[Path]:
+        """
+        Drops a canvas from the index. Returns its directory, for the caller to
+        trash once nothing writes there, or None if it cannot be deleted.
+        """
+        if canvas_id == "default": return None 
         
         if canvas_id in self.index["canvases"]:
             del self.index["canvases"][canvas_id]
             if self.index["active_id"] == canvas_id:
                 self.index["active_id"] = "default"
             self._save_index(self.index)
-            path = Path(CANVASES_DIR) / canvas_id
-            if path.exists():
-                shutil.rmtree(str(path))
-            return True
-        return False
+            return Path(CANVASES_DIR) / canvas_id
+        return None
 
 class ContextRegistry:
     """Manages the persistent hierarchy of Topics and Modules PER CANVAS."""
@@ -174,6 +303,8 @@ class ContextRegistry:
             "#FF453A", # System Pink
         ]
         self.context = self._load_context()
+        # Bumped on every structure change so callers can cache derived text
+        self.version = 0
 
     def _ensure_dir(self):
         # self.file_path is already a Path object, use .parent
@@ -186,8 +317,7 @@ class ContextRegistry:
     def _load_context(self) -> Dict[str, Any]:
         if self.file_path.exists():
             try:
-                with open(self.file_path, 'r') as f:
-                    return json.load(f)
+                return _read_json(self.file_path)
             except Exception as e:
                 logger.error(f"Failed to load context: {e}")
         
@@ -196,8 +326,7 @@ class ContextRegistry:
         if self.canvas_id == "default" and legacy_path.exists():
              logger.info("Migrating legacy context to default canvas...")
              try:
-                 with open(legacy_path, 'r') as f:
-                     data = json.load(f)
+                 data = _read_json(legacy_path)
                  self._save_context(data)
                  return data
              except Exception as e:
@@ -220,16 +349,16 @@ class ContextRegistry:
 
     def _save_context(self, data: Dict[str, Any]):
         try:
-            with open(self.file_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            _atomic_write_bytes(self.file_path, fastjson.dumps(data))
             logger.info("Context registry saved.")
         except Exception as e:
             logger.error(f"Failed to save context: {e}")
 
     def update_structure(self, topic: str, module_name: str = None, description: str = ""):
         """
-        Updates or creates a Topic/Module.
+        Updates or creates a Topic/Module. Persists only if something was added.
         """
+        modified = False
         if topic not in self.context["topics"]:
             self.context["topics"][topic] = {
                 "description": description if not module_name else "Auto-generated topic",
@@ -237,13 +366,17 @@ class ContextRegistry:
                 "modules": {}
             }
             logger.info(f"Created new Topic: {topic}")
+            modified = True
 
         if module_name:
             if module_name not in self.context["topics"][topic]["modules"]:
                 self.context["topics"][topic]["modules"][module_name] = description
                 logger.info(f"Created new Module: {module_name} in {topic}")
+                modified = True
         
-        self._save_context(self.context)
+        if modified:
+            self.version += 1
+            self._save_context(self.context)
 
     def get_structure_summary(self) -> str:
         """
@@ -271,42 +404,126 @@ class Weaver:
             "topic": 0, "module": 1, "parent": 2, "child": 3
         }
         
+        # Bumped whenever the graph changes; lets callers cache derived data
+        self.epoch = 0
+        # Bumped only when nodes or edges are added/removed; keys _node_index
+        self._topology_epoch = 0
+        self._topology = (None, None)
+        
+        # O_APPEND descriptor for the active canvas's write-ahead log
+        self._wal_fd = None
+        # Future of the in-flight background compaction, if any
+        self._compaction = None
+        # O_APPEND descriptor for the active canvas's chat message log
+        self._chat_fd = None
+        # monotonic time of the last canvas index write from _touch_canvas
+        self._touched_at = 0.0
+        
         # Initialize Graph and Context for active canvas
         self.load_active_canvas()
 
     def load_active_canvas(self):
-        self.active_canvas_id = self.canvas_registry.get_active_id()
-        self.graph_file = Path(CANVASES_DIR) / self.active_canvas_id / "graph.json"
-        self.chat_file = Path(CANVASES_DIR) / self.active_canvas_id / "chat.json"
+        self._wait_for_compaction()
+        self._install_canvas(self._read_canvas(self.canvas_registry.get_active_id()))
+
+    async def load_active_canvas_async(self):
+        """
+        load_active_canvas for request handlers: the canvas files are read in a
+        worker thread and only the swap of live state runs on the event loop.
+        """
+        await self._await_compaction()
+        canvas = await asyncio.to_thread(self._read_canvas, self.canvas_registry.get_active_id())
+        self._install_canvas(canvas)
+
+    @classmethod
+    def _read_canvas(cls, canvas_id: str) -> Dict[str, Any]:
+        """
+        Reads a canvas's files into fresh objects without touching the live
+        state, so it can run in a worker thread. The canvas must not be active.
+        """
+        canvas_dir = Path(CANVASES_DIR) / canvas_id
+        canvas = {
+            "canvas_id": canvas_id,
+            "graph_file": canvas_dir / "graph.json",
+            "wal_file": canvas_dir / "graph.wal",
+            # WAL segment being folded into graph.json by a background compaction
+            "wal_prev_file": canvas_dir / "graph.wal.prev",
+            "chat_file": canvas_dir / "chat.json",
+            "chat_log_file": canvas_dir / "chat.jsonl",
+        }
         
         # Ensure dir
-        self.graph_file.parent.mkdir(parents=True, exist_ok=True)
+        canvas_dir.mkdir(parents=True, exist_ok=True)
         
-        self.graph = self._load_graph_file()
-        self.registry = ContextRegistry(self.active_canvas_id)
-        self.chat_history = self._load_chat_history()
+        graph = cls._load_graph_file(canvas_id, canvas["graph_file"])
+        canvas["snapshot_bytes"] = canvas["graph_file"].stat().st_size if canvas["graph_file"].exists() else 0
+        canvas["wal_bytes"] = canvas["wal_file"].stat().st_size if canvas["wal_file"].exists() else 0
+        cls._replay_wal(graph, (canvas["wal_prev_file"], canvas["wal_file"]))
+        canvas["graph"] = graph
+        canvas["registry"] = ContextRegistry(canvas_id)
+        history, sessions = cls._load_chat_history(canvas["chat_file"], canvas["chat_log_file"])
+        if canvas["chat_log_file"].exists() and canvas["chat_log_file"].stat().st_size:
+            # Nothing appends to an inactive canvas's log, so fold it in now
+            cls._save_chat_history(canvas["chat_file"], canvas["chat_log_file"], history)
+        canvas["chat_history"] = history
+        canvas["chat_sessions"] = sessions
+        return canvas
+
+    def _install_canvas(self, canvas: Dict[str, Any]):
+        """Makes a canvas read by _read_canvas the active one."""
+        self._close_wal()
+        self._close_chat_log()
+        self.active_canvas_id = canvas["canvas_id"]
+        self.graph_file = canvas["graph_file"]
+        self.wal_file = canvas["wal_file"]
+        self.wal_prev_file = canvas["wal_prev_file"]
+        self.chat_file = canvas["chat_file"]
+        self.chat_log_file = canvas["chat_log_file"]
+        self.graph = canvas["graph"]
+        self._snapshot_bytes = canvas["snapshot_bytes"]
+        self._wal_bytes = canvas["wal_bytes"]
+        if self.wal_prev_file.exists():
+            # A background compaction did not finish; fold both segments now
+            self.compact()
+        self._rebuild_summaries()
+        self.epoch += 1
+        self._topology_epoch += 1
+        self.registry = canvas["registry"]
+        self.chat_history = canvas["chat_history"]
+        self._chat_sessions = canvas["chat_sessions"]
         
         logger.info(f"Weaver loaded canvas: {self.active_canvas_id}")
 
-    def switch_canvas(self, canvas_id: str):
+    async def switch_canvas(self, canvas_id: str):
+        if canvas_id == self.active_canvas_id:
+            return canvas_id in self.canvas_registry.index["canvases"]
         if self.canvas_registry.set_active_id(canvas_id):
-            self.load_active_canvas()
+            await self.load_active_canvas_async()
             return True
         return False
 
-    def create_canvas(self, name: str):
+    async def create_canvas(self, name: str):
         new_id = self.canvas_registry.create_canvas(name)
-        self.switch_canvas(new_id)
+        await self.load_active_canvas_async()
         return new_id
         
-    def delete_canvas(self, canvas_id: str):
-        return self.canvas_registry.delete_canvas(canvas_id)
+    async def delete_canvas(self, canvas_id: str):
+        was_active = canvas_id == self.active_canvas_id
+        path = self.canvas_registry.delete_canvas(canvas_id)
+        if path is None:
+            return False
+        if was_active:
+            # The registry fell back to the default canvas
+            await self.load_active_canvas_async()
+        await self._await_compaction()
+        await asyncio.to_thread(_trash_dir, path)
+        return True
 
-    def _load_graph_file(self):
-        if self.graph_file.exists():
+    @staticmethod
+    def _load_graph_file(canvas_id: str, graph_file: Path):
+        if graph_file.exists():
             try:
-                with open(self.graph_file, 'r') as f:
-                    data = json.load(f)
+                data = _read_json(graph_file)
                 return nx.node_link_graph(data)
             except Exception as e:
                 logger.error(f"Failed to load graph: {e}")
@@ -314,38 +531,204 @@ class Weaver:
         
         # Migration: Check root
         legacy_path = Path(DATA_DIR) / "nexus_graph.json"
-        if self.active_canvas_id == "default" and legacy_path.exists():
+        if canvas_id == "default" and legacy_path.exists():
              logger.info("Migrating legacy graph to default canvas...")
              try:
-                 with open(legacy_path, 'r') as f:
-                     data = json.load(f)
+                 data = _read_json(legacy_path)
                  g = nx.node_link_graph(data)
                  data_export = nx.node_link_data(g)
-                 with open(self.graph_file, 'w') as f:
-                     json.dump(data_export, f, indent=2)
+                 _atomic_write_bytes(graph_file, fastjson.dumps(data_export))
                  return g
              except Exception as e:
                  logger.error(f"Migration failed: {e}")
 
         return nx.DiGraph()
 
-    def save_graph(self):
-        """Persists the current graph state to disk."""
-        data = nx.node_link_data(self.graph)
+    async def save_graph(self) -> bool:
+        """
+        Persists the current graph state to disk: serialized and WAL-rotated on
+        the event loop, written by the compaction thread. Returns True once written.
+        """
+        self.epoch += 1
+        # Callers may have edited node attributes directly
+        self._rebuild_summaries()
+        written = await self.compact_async()
+        self._touch_canvas(force=True)
+        return written
+
+    async def compact_async(self) -> bool:
+        """
+        compact() for request handlers: the graph is serialized and its WAL
+        rotated on the event loop, and only the graph.json write runs in the
+        compaction thread. Returns True once the snapshot is written.
+        """
+        await self._await_compaction()
+        self._start_compaction()
+        if self._compaction is None:
+            return True
+        return await asyncio.wrap_future(self._compaction)
+
+    def compact(self):
+        """
+        Writes a full graph.json snapshot and truncates the WAL it supersedes.
+        """
+        self._wait_for_compaction()
+        data = fastjson.dumps(nx.node_link_data(self.graph))
+        _atomic_write_bytes(self.graph_file, data)
+        self._close_wal()
+        with open(self.wal_file, 'w'):
+            pass
+        if self.wal_prev_file.exists():
+            self.wal_prev_file.unlink()
+        self._snapshot_bytes = len(data)
+        self._wal_bytes = 0
+        logger.info(f"Graph saved to {self.graph_file}")
+
+    def _compact_in_background(self):
+        if self._compaction is not None and not self._compaction.done():
+            return
+        self._start_compaction()
+
+    def _start_compaction(self):
+        """
+        Serializes the graph now, rotates graph.wal to graph.wal.prev so new
+        deltas go to a fresh log, and leaves writing graph.json (and dropping
+        graph.wal.prev) to the compaction thread. The previous compaction must
+        be done.
+        """
+        if self.wal_prev_file.exists():
+            # The last background write failed; its segment must not be overwritten
+            self.compact()
+            return
+        data = fastjson.dumps(nx.node_link_data(self.graph))
+        self._close_wal()
+        if self.wal_file.exists():
+            os.replace(self.wal_file, self.wal_prev_file)
+        self._snapshot_bytes = len(data)
+        self._wal_bytes = 0
+        self._compaction = _compact_executor.submit(self._write_snapshot, self.graph_file, self.wal_prev_file, data)
+
+    @staticmethod
+    def _write_snapshot(graph_file: Path, wal_prev_file: Path, data: bytes) -> bool:
         try:
-            with open(self.graph_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            logger.info(f"Graph saved to {self.graph_file}")
-            # Update canvas last_modified timestamp
-            if self.active_canvas_id in self.canvas_registry.index["canvases"]:
-                self.canvas_registry.index["canvases"][self.active_canvas_id]["last_modified"] = datetime.now().isoformat()
+            _atomic_write_bytes(graph_file, data)
+            if wal_prev_file.exists():
+                wal_prev_file.unlink()
+            logger.info(f"Graph compacted to {graph_file}")
+            return True
+        except Exception as e:
+            # graph.wal.prev is kept, so the deltas are replayed on next load
+            logger.error(f"Background compaction failed: {e}")
+            return False
+
+    async def _await_compaction(self):
+        """_wait_for_compaction without blocking the event loop."""
+        while self._compaction is not None and not self._compaction.done():
+            await asyncio.wrap_future(self._compaction)
+
+    def _wait_for_compaction(self):
+        if self._compaction is not None:
+            self._compaction.result()
+            self._compaction = None
+
+    def close(self):
+        """Finishes any background compaction and closes the open log descriptors."""
+        self._wait_for_compaction()
+        self._close_wal()
+        self._close_chat_log()
+
+    def _touch_canvas(self, force: bool = False):
+        # Update canvas last_modified timestamp; the index file is rewritten at
+        # most every CANVAS_TOUCH_INTERVAL seconds unless forced
+        if self.active_canvas_id in self.canvas_registry.index["canvases"]:
+            self.canvas_registry.index["canvases"][self.active_canvas_id]["last_modified"] = datetime.now().isoformat()
+            now = time.monotonic()
+            if force or now - self._touched_at >= CANVAS_TOUCH_INTERVAL:
                 self.canvas_registry._save_index(self.canvas_registry.index)
+                self._touched_at = now
+
+    def _close_wal(self):
+        if self._wal_fd is not None:
+            os.close(self._wal_fd)
+            self._wal_fd = None
+
+    def _append_delta(self, op: str, **payload):
+        """
+        Records one graph mutation as a line in graph.wal instead of rewriting
+        graph.json, compacting once the log outgrows the snapshot.
+        """
+        self.epoch += 1
+        record = fastjson.dumps({"op": op, **payload}) + b"\n"
+        try:
+            if self._wal_fd is None:
+                self._wal_fd = os.open(self.wal_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            # One unbuffered write per delta: no userspace buffer to flush
+            os.write(self._wal_fd, record)
+            self._wal_bytes += len(record)
+            if self._wal_bytes > max(WAL_COMPACT_RATIO * self._snapshot_bytes, WAL_COMPACT_MIN_BYTES):
+                self._compact_in_background()
+            self._touch_canvas()
         except Exception as e:
-            logger.error(f"Failed to save graph: {e}")
+            logger.error(f"Failed to save graph delta: {e}")
+
+    @classmethod
+    def _replay_wal(cls, graph: nx.DiGraph, wal_files):
+        """
+        Applies the deltas logged since the last snapshot, oldest segment first.
+        Deltas set state rather than adjust it, so replaying a segment the
+        snapshot already includes is harmless.
+        """
+        for wal_file in wal_files:
+            if not wal_file.exists():
+                continue
+            applied = 0
+            with open(wal_file, 'rb') as f:
+                for line in f:
+                    try:
+                        delta = fastjson.loads(line)
+                    except ValueError:
+                        # Torn final record from an interrupted write
+                        logger.warning(f"Skipping unreadable WAL record in {wal_file}")
+                        continue
+                    cls._apply_delta(graph, delta)
+                    applied += 1
+            if applied:
+                logger.info(f"Replayed {applied} graph deltas from {wal_file}")
+
+    @staticmethod
+    def _apply_delta(graph: nx.DiGraph, delta: Dict[str, Any]):
+        op = delta["op"]
+        if op == "add_node":
+            graph.add_node(delta["id"], **delta["attrs"])
+        elif op == "update_node":
+            if graph.has_node(delta["id"]):
+                graph.nodes[delta["id"]].update(delta["updates"])
+        elif op == "positions":
+            for node_id, pos in delta["positions"].items():
+                if graph.has_node(node_id):
+                    graph.nodes[node_id]["position"] = pos
+        elif op == "remove_node":
+            if graph.has_node(delta["id"]):
+                graph.remove_node(delta["id"])
+        elif op == "add_edge":
+            graph.add_edge(delta["source"], delta["target"], **delta["attrs"])
+        elif op == "add_edges":
+            source = delta["source"]
+            graph.add_edges_from((source, target, attrs) for target, attrs in delta["edges"])
+        elif op == "update_edge":
+            if graph.has_edge(delta["source"], delta["target"]):
+                graph.edges[delta["source"], delta["target"]].update(delta["updates"])
+        elif op == "remove_edge":
+            if graph.has_edge(delta["source"], delta["target"]):
+                graph.remove_edge(delta["source"], delta["target"])
+        else:
+            logger.warning(f"Unknown WAL op: {op}")
     
-    def save_all(self) -> Dict[str, Any]:
+    async def save_all(self) -> Dict[str, Any]:
         """
         Manually saves all canvas data: graph, context, chat history, and settings.
+        Context, settings and chat messages are written as they change, so they
+        only need flushing here; the flush runs in a worker thread.
         Returns save status information.
         """
         save_status = {
@@ -357,52 +740,102 @@ class Weaver:
         
         try:
             # Save graph
-            self.save_graph()
-            save_status["saved"].append("graph")
+            if await self.save_graph():
+                save_status["saved"].append("graph")
+            else:
+                save_status["errors"].append("graph: snapshot write failed")
         except Exception as e:
             save_status["errors"].append(f"graph: {str(e)}")
         
         try:
-            # Save context
-            self.registry._save_context(self.registry.context)
-            save_status["saved"].append("context")
-        except Exception as e:
-            save_status["errors"].append(f"context: {str(e)}")
-        
-        try:
-            # Save chat history (if it exists)
-            if hasattr(self, 'chat_history'):
-                self.save_chat_history(self.chat_history)
-                save_status["saved"].append("chat_history")
-        except Exception as e:
-            save_status["errors"].append(f"chat_history: {str(e)}")
-        
-        try:
-            # Save settings
-            self.settings._save_settings(self.settings.settings)
-            save_status["saved"].append("settings")
+            # Explicit saves are the durability point for the append-only logs and
+            # for renames into place; the loop may close the live descriptors meanwhile
+            log_fds = [os.dup(fd) for fd in (self._wal_fd, self._chat_fd) if fd is not None]
+            await asyncio.to_thread(_fsync_paths, [
+                self.graph_file, self.registry.file_path, self.chat_file, SETTINGS_FILE, CANVAS_INDEX_FILE
+            ], log_fds)
+            save_status["saved"].extend(["context", "chat_history", "settings"])
         except Exception as e:
-            save_status["errors"].append(f"settings: {str(e)}")
+            save_status["errors"].append(f"fsync: {str(e)}")
         
         logger.info(f"Manual save completed: {save_status}")
         return save_status
 
-    def _load_chat_history(self) -> List[Dict]:
-        """Loads chat history from disk."""
-        if self.chat_file.exists():
+    @staticmethod
+    def _load_chat_history(chat_file: Path, chat_log_file: Path) -> Tuple[List[Dict], Dict[str, Dict]]:
+        """
+        Loads chat history from disk: the chat.json snapshot, then the messages
+        logged to chat.jsonl since. Returns one {session_id, messages} entry per
+        session, plus those entries by session id.
+        """
+        sessions = {}
+        history = []
+
+        def session_entry(session_id: str) -> Dict[str, Any]:
+            entry = sessions.get(session_id)
+            if entry is None:
+                entry = {"session_id": session_id, "messages": []}
+                sessions[session_id] = entry
+                history.append(entry)
+            return entry
+
+        if chat_file.exists():
             try:
-                with open(self.chat_file, 'r') as f:
-                    return json.load(f)
+                # Older snapshots repeat a session once per turn, each with the
+                # full message list so far; the last copy wins
+                for saved in _read_json(chat_file):
+                    session_entry(saved["session_id"])["messages"] = saved["messages"]
             except Exception as e:
                 logger.error(f"Failed to load chat history: {e}")
-        return []
 
-    def save_chat_history(self, history: List[Dict]):
-        """Saves chat history to disk."""
+        if chat_log_file.exists():
+            with open(chat_log_file, 'rb') as f:
+                for line in f:
+                    try:
+                        message = fastjson.loads(line)
+                    except ValueError:
+                        # Torn final record from an interrupted write
+                        logger.warning(f"Skipping unreadable chat record in {chat_log_file}")
+                        continue
+                    session_entry(message.pop("session_id"))["messages"].append(message)
+        return history, sessions
+
+    def get_chat_messages(self, session_id: str) -> Optional[List[Dict]]:
+        """Returns the persisted messages of a chat session, or None if unknown."""
+        entry = self._chat_sessions.get(session_id)
+        return entry["messages"] if entry is not None else None
+
+    def _close_chat_log(self):
+        if self._chat_fd is not None:
+            os.close(self._chat_fd)
+            self._chat_fd = None
+
+    def append_chat_messages(self, session_id: str, messages: List[Dict]):
+        """
+        Records new chat messages as lines in chat.jsonl, so each turn writes
+        only its own messages instead of rewriting the whole history.
+        """
+        entry = self._chat_sessions.get(session_id)
+        if entry is None:
+            entry = {"session_id": session_id, "messages": []}
+            self._chat_sessions[session_id] = entry
+            self.chat_history.append(entry)
+        entry["messages"].extend(messages)
+        records = b"".join(fastjson.dumps({"session_id": session_id, **m}) + b"\n" for m in messages)
         try:
-            with open(self.chat_file, 'w') as f:
-                json.dump(history, f, indent=2)
-            # logger.info("Chat history saved.") 
+            if self._chat_fd is None:
+                self._chat_fd = os.open(self.chat_log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            os.write(self._chat_fd, records)
+        except Exception as e:
+            logger.error(f"Failed to save chat messages: {e}")
+
+    @staticmethod
+    def _save_chat_history(chat_file: Path, chat_log_file: Path, history: List[Dict]):
+        """Saves a chat.json snapshot and truncates the chat.jsonl log it supersedes."""
+        try:
+            _atomic_write_bytes(chat_file, fastjson.dumps(history))
+            with open(chat_log_file, 'w'):
+                pass
         except Exception as e:
             logger.error(f"Failed to save chat history: {e}")
 
@@ -410,22 +843,28 @@ class Weaver:
         """
         Returns a lightweight list of nodes for LLM analysis (ID, Title, Summary, Tags).
         Used for auto-linking context.
+        Served from a per-node cache kept current by the Weaver mutators; treat
+        the returned dicts as read-only.
         """
-        summaries = []
-        for node_id, data in self.graph.nodes(data=True):
-            if exclude_id and node_id == exclude_id:
-                continue
-            
-            summaries.append({
-                "id": node_id,
-                "title": data.get("title", node_id),
-                "summary": data.get("summary", ""),
-                "tags": data.get("tags", []),
-                "module": data.get("module", "General"),
-                "main_topic": data.get("main_topic", "Uncategorized"),
-                "node_type": data.get("node_type", "child") # Default to child
-            })
-        return summaries
+        return [summary for node_id, summary in self._summaries.items() if node_id != exclude_id]
+
+    @staticmethod
+    def _node_summary(node_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": node_id,
+            "title": data.get("title", node_id),
+            "summary": data.get("summary", ""),
+            "tags": data.get("tags", []),
+            "module": data.get("module", "General"),
+            "main_topic": data.get("main_topic", "Uncategorized"),
+            "node_type": data.get("node_type", "child") # Default to child
+        }
+
+    def _rebuild_summaries(self):
+        self._summaries = {
+            node_id: self._node_summary(node_id, data)
+            for node_id, data in self.graph.nodes(data=True)
+        }
 
     def add_document_node(self, filename: str, content: str, meta: Dict[str, Any] = None):
         """
@@ -449,7 +888,9 @@ class Weaver:
             attributes.update(meta)
             
         self.graph.add_node(node_id, **attributes)
-        self.save_graph()
+        self._topology_epoch += 1
+        self._summaries[node_id] = self._node_summary(node_id, self.graph.nodes[node_id])
+        self._append_delta("add_node", id=node_id, attrs=attributes)
         return node_id
 
     def add_edge(self, source: str, target: str, justification: str, confidence: float = 1.0):
@@ -474,25 +915,68 @@ class Weaver:
                  # Interpreting strictly: Child -> Parent is allowed. Parent -> Child is BLOCKED.
                  return False
 
-            self.graph.add_edge(source, target, justification=justification, confidence=confidence)
-            self.save_graph()
+            attrs = {"justification": justification, "confidence": confidence}
+            if self.graph.has_edge(source, target) and self.graph.edges[source, target] == attrs:
+                return True  # Identical edge already recorded
+            self.graph.add_edge(source, target, **attrs)
+            self._topology_epoch += 1
+            self._append_delta("add_edge", source=source, target=target, attrs=attrs)
             return True
         return False
 
+    def add_edges(self, source: str, links: List[Tuple[str, str, float]]) -> int:
+        """
+        Adds several justified edges from one source, e.g. auto-link suggestions.
+        links: [(target, justification, confidence), ...]. Applies the same checks
+        as add_edge but records all new edges as a single WAL entry.
+        Returns how many links were accepted.
+        """
+        if not self.graph.has_node(source):
+            return 0
+        source_type = self.graph.nodes[source].get("node_type", "child")
+        source_level = self.hierarchy_levels.get(source_type, 3)
+
+        accepted = 0
+        added = []
+        for target, justification, confidence in links:
+            if not self.graph.has_node(target):
+                continue
+            target_type = self.graph.nodes[target].get("node_type", "child")
+            if source_level < self.hierarchy_levels.get(target_type, 3):
+                logger.warning(f"Hierarchy Violation: {source} ({source_type}) cannot point down to {target} ({target_type})")
+                continue
+            accepted += 1
+            attrs = {"justification": justification, "confidence": confidence}
+            if self.graph.has_edge(source, target) and self.graph.edges[source, target] == attrs:
+                continue
+            self.graph.add_edge(source, target, **attrs)
+            added.append([target, attrs])
+
+        if added:
+            self._topology_epoch += 1
+            self._append_delta("add_edges", source=source, edges=added)
+        return accepted
+
     def delete_node(self, node_id: str) -> bool:
         """Deletes a node and its edges."""
         if self.graph.has_node(node_id):
             self.graph.remove_node(node_id)
-            self.save_graph()
+            self._topology_epoch += 1
+            self._summaries.pop(node_id, None)
+            self._append_delta("remove_node", id=node_id)
             return True
         return False
 
     def update_node(self, node_id: str, updates: Dict[str, Any]) -> bool:
         """Updates node attributes."""
         if self.graph.has_node(node_id):
-            for key, value in updates.items():
-                self.graph.nodes[node_id][key] = value
-            self.save_graph()
+            attrs = self.graph.nodes[node_id]
+            changed = {k: v for k, v in updates.items() if k not in attrs or attrs[k] != v}
+            if not changed:
+                return True
+            attrs.update(changed)
+            self._summaries[node_id] = self._node_summary(node_id, attrs)
+            self._append_delta("update_node", id=node_id, updates=changed)
             return True
         return False
     
@@ -501,20 +985,26 @@ class Weaver:
         Updates positions for multiple nodes at once.
         positions: { node_id: { x: float, y: float }, ... }
         """
+        applied = {}
         updated = False
         for node_id, pos in positions.items():
             if self.graph.has_node(node_id):
-                self.graph.nodes[node_id]["position"] = pos
                 updated = True
-        if updated:
-            self.save_graph()
+                attrs = self.graph.nodes[node_id]
+                if attrs.get("position") != pos:
+                    attrs["position"] = pos
+                    applied[node_id] = pos
+        # Clients re-send the last known positions on drag end; log only real moves
+        if applied:
+            self._append_delta("positions", positions=applied)
         return updated
 
     def delete_edge(self, source: str, target: str) -> bool:
         """Deletes an edge."""
         if self.graph.has_edge(source, target):
             self.graph.remove_edge(source, target)
-            self.save_graph()
+            self._topology_epoch += 1
+            self._append_delta("remove_edge", source=source, target=target)
             return True
         return False
 
@@ -522,40 +1012,69 @@ class Weaver:
         """Updates edge attributes."""
         if self.graph.has_edge(source, target):
             nx.set_edge_attributes(self.graph, {(source, target): updates})
-            self.save_graph()
+            self._append_delta("update_edge", source=source, target=target, updates=updates)
             return True
         return False
 
+    def _node_index(self):
+        """
+        Dense integer view of the topology, rebuilt only after nodes or edges change.
+        Returns (ids, id_to_idx, indptr, indices): node i is ids[i], and its
+        undirected neighbors are indices[indptr[i]:indptr[i + 1]].
+        """
+        epoch, index = self._topology
+        if epoch == self._topology_epoch:
+            return index
+        ids = list(self.graph.nodes())
+        id_to_idx = {n: i for i, n in enumerate(ids)}
+        succ, pred = self.graph.succ, self.graph.pred
+        indptr = array('l', [0])
+        indices = array('l')
+        for n in ids:
+            indices.extend(id_to_idx[m] for m in succ[n].keys() | pred[n].keys())
+            indptr.append(len(indices))
+        index = (ids, id_to_idx, indptr, indices)
+        self._topology = (self._topology_epoch, index)
+        return index
+
+    def warm_caches(self):
+        """Builds the lazily derived traversal index now rather than on the first context request."""
+        self._node_index()
+
     def get_subgraph(self, selected_node_ids: List[str], depth: int) -> Dict[str, Any]:
         """
-        Calculates the subgraph based on depth setting (F0, F1, F2).
+        Calculates the subgraph based on depth setting (F0, F1, F2):
+        every node within `depth` hops of a seed, ignoring edge direction.
         REQ-LOG-01: Graph Topology Traversal
         """
         if not selected_node_ids:
             return {"nodes": [], "edges": []}
 
-        valid_seeds = [n for n in selected_node_ids if self.graph.has_node(n)]
+        ids, id_to_idx, indptr, indices = self._node_index()
         
-        context_nodes: Set[str] = set(valid_seeds)
+        # Level-synchronous BFS over the undirected CSR adjacency, `depth` hops out
+        visited = bytearray(len(ids))
+        frontier = []
+        for n in selected_node_ids:
+            i = id_to_idx.get(n)
+            if i is not None and not visited[i]:
+                visited[i] = 1
+                frontier.append(i)
+        context_idx = list(frontier)
 
-        if depth == 0:
-            pass
-        elif depth == 1:
-            for node in valid_seeds:
-                neighbors = set(self.graph.neighbors(node)) | set(self.graph.predecessors(node))
-                context_nodes.update(neighbors)
-        elif depth == 2:
-            f1_nodes = set(valid_seeds)
-            for node in valid_seeds:
-                neighbors = set(self.graph.neighbors(node)) | set(self.graph.predecessors(node))
-                f1_nodes.update(neighbors)
-            
-            context_nodes.update(f1_nodes)
-            for node in list(f1_nodes):
-                if self.graph.has_node(node):
-                    neighbors = set(self.graph.neighbors(node)) | set(self.graph.predecessors(node))
-                    context_nodes.update(neighbors)
+        for _ in range(depth):
+            next_frontier = []
+            for i in frontier:
+                for j in indices[indptr[i]:indptr[i + 1]]:
+                    if not visited[j]:
+                        visited[j] = 1
+                        next_frontier.append(j)
+            if not next_frontier:
+                break
+            context_idx.extend(next_frontier)
+            frontier = next_frontier
         
+        context_nodes = [ids[i] for i in context_idx]
         subgraph = self.graph.subgraph(context_nodes)
         
         return {
@@ -0,0 +1,68 @@
+"""
+In-memory chat session store with idle expiry, an LRU size cap and per-canvas invalidation.
+"""
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+# Sessions idle longer than this are dropped (seconds)
+SESSION_TTL_SECONDS = 3600
+# Most sessions kept at once; the least recently used is evicted beyond this
+SESSION_MAX_ENTRIES = 512
+
+
+class SessionStore:
+    """
+    Holds active chat sessions keyed by session_id, each tagged with the
+    canvas it was created on. Entries are kept in last-used order, so expired
+    ones are always at the front and are purged lazily on access; past
+    max_entries the least recently used session is evicted.
+    """
+    def __init__(self, ttl: float = SESSION_TTL_SECONDS, max_entries: int = SESSION_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()  # id -> (expires_at, canvas_id, session)
+        self._lock = threading.Lock()
+
+    def _purge_expired(self, now: float):
+        while self._sessions:
+            expires_at, _, _ = next(iter(self._sessions.values()))
+            if expires_at > now:
+                break
+            self._sessions.popitem(last=False)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the live session and refreshes its expiry, or None."""
+        now = time.monotonic()
+        with self._lock:
+            self._purge_expired(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            _, canvas_id, session = entry
+            self._sessions[session_id] = (now + self.ttl, canvas_id, session)
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def put(self, session_id: str, session: Dict[str, Any], canvas_id: str):
+        now = time.monotonic()
+        with self._lock:
+            self._purge_expired(now)
+            self._sessions[session_id] = (now + self.ttl, canvas_id, session)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_entries:
+                self._sessions.popitem(last=False)
+
+    def invalidate_canvas(self, canvas_id: str) -> int:
+        """Drops every session created on canvas_id. Returns how many were removed."""
+        with self._lock:
+            stale = [sid for sid, (_, cid, _) in self._sessions.items() if cid == canvas_id]
+            for sid in stale:
+                del self._sessions[sid]
+            return len(stale)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._purge_expired(time.monotonic())
+            return len(self._sessions)
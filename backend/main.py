@@ -1,39 +1,113 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+from fastapi.responses import Response, StreamingResponse, JSONResponse
+from fastapi.routing import APIRoute
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from uuid import uuid4
 import logging
+import asyncio
+import codecs
+import functools
 import shutil
 import os
 import sys
-import json
+import re
+import hashlib
+import secrets
+import time
+import zipfile
+import traceback
+from contextlib import asynccontextmanager
 from datetime import datetime
+from pathlib import Path
 from dotenv import load_dotenv
 
 # Setup Logging FIRST - before any logger usage
-logging.basicConfig(level=logging.INFO)
+# Serverless runtimes install their own root handler; only configure one locally
+if not logging.root.handlers:
+    logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("NexusAPI")
 
 # Load environment variables from .env file
 load_dotenv(override=True)
 
 # Import core modules - these should not fail even if initialization does
+from core import fastjson
+from core.session_store import SessionStore
+from core.storage_adapter import (
+    CANVASES_DIR, SETTINGS_FILE, CANVAS_INDEX_FILE, THUMBNAILS_DIR, IS_VERCEL, get_storage_info
+)
+
+# Upper bound on how long startup waits for the Gemini prewarm call (seconds)
+LLM_PREWARM_TIMEOUT = 3.0
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered via core.fastjson (orjson when installed)."""
+    def render(self, content: Any) -> bytes:
+        return fastjson.dumps(content)
+
+
+class FastJSONRequest(Request):
+    """Request whose JSON body (and so every pydantic body model) is parsed via core.fastjson."""
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = fastjson.loads(await self.body())
+        return self._json
+
+
+class FastJSONRoute(APIRoute):
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def fastjson_handler(request: Request) -> Response:
+            return await handler(FastJSONRequest(request.scope, request.receive))
+
+        return fastjson_handler
+
 try:
     from core.graph_logic import Weaver
-    from core.chat_bridge import ChatBridge
+    from core.chat_bridge import ChatBridge, get_chat_bridge
     logger.info("Core modules imported successfully")
 except ImportError as ie:
     logger.error(f"Failed to import core modules: {ie}", exc_info=True)
     # Set to None so app can still start
     Weaver = None
     ChatBridge = None
+    get_chat_bridge = None
 
-app = FastAPI(title="Nexus Core API", version="2.0.4")
+async def _prewarm_llm():
+    try:
+        await asyncio.wait_for(chat_bridge.prewarm(), timeout=LLM_PREWARM_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Gemini prewarm skipped: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warms the graph traversal index and the Gemini connection before the first
+    request, and closes the Weaver's logs on shutdown. On Vercel the Gemini
+    prewarm runs in the background so cold starts do not wait on it.
+    """
+    prewarm = None
+    if weaver:
+        await asyncio.to_thread(weaver.warm_caches)
+    if chat_bridge:
+        if IS_VERCEL:
+            prewarm = asyncio.ensure_future(_prewarm_llm())
+        else:
+            await _prewarm_llm()
+    yield
+    if prewarm is not None:
+        prewarm.cancel()
+    if weaver:
+        await asyncio.to_thread(weaver.close)
+
+app = FastAPI(title="Nexus Core API", version="2.0.4", default_response_class=FastJSONResponse, lifespan=lifespan)
+app.router.route_class = FastJSONRoute
 
 # Global exception handler for unhandled exceptions
-from fastapi.responses import JSONResponse
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -57,6 +131,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Read size for streaming uploads (bytes)
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Classifies ingested text in one match: YouTube URL, other web URL, or no match
+URL_KIND_RE = re.compile(r"(?P<youtube>https://(?:www\.youtube\.com|youtu\.be)/)|https?://")
+# Nodes/edges serialized per chunk when streaming /api/v2/graph
+GRAPH_STREAM_CHUNK = 500
+# Largest /api/v2/graph body kept in memory for repeat requests (bytes)
+GRAPH_BODY_CACHE_MAX_BYTES = 8 * 1024 * 1024
+# Mixed into graph ETags: Weaver.epoch restarts at 0 in every process
+GRAPH_ETAG_SALT = secrets.token_hex(8)
+
+# YouTube video id in standard, short, and embed URLs
+YOUTUBE_ID_RE = re.compile(r"(?:v=|/)([0-9A-Za-z_-]{11})")
+# Runs of non-word characters (and underscores) collapsed in node id slugs
+SLUG_RE = re.compile(r"[\W_]+")
+# ISO-BMFF major brands of AVIF / HEIF stills; other ftyp files are video (MP4, MOV)
+IMAGE_FTYP_BRANDS = {b"avif", b"avis", b"heic", b"heix", b"mif1", b"msf1"}
+
+def _new_node_id(title: Any, default: str, max_slug: int = 20) -> str:
+    """
+    Builds a readable node id: an upper-case title slug plus 32 random
+    bits in hex. The suffix never contains '_', so ids split cleanly at the last one.
+    """
+    slug = SLUG_RE.sub("_", str(title or default).upper()).strip("_")[:max_slug] or default
+    return f"{slug}_{secrets.token_hex(4)}"
+
+def _thumbnail_filename(upload_name: Optional[str], prefix: str = "") -> str:
+    """
+    Random thumbnail filename keeping the upload's extension (png if it has
+    none usable). 128 random bits, so bulk uploads cannot collide.
+    """
+    ext = os.path.splitext(upload_name or "")[1][1:]
+    if not ext.isalnum():
+        ext = "png"
+    return f"{prefix}{secrets.token_hex(16)}.{ext}"
+
 # Initialize Core Components
 weaver = None
 chat_bridge = None
@@ -65,7 +176,6 @@ init_error = None
 def initialize_components():
     """Initialize components with retry logic"""
     global weaver, chat_bridge, init_error
-    import traceback
     try:
         logger.info("Starting component initialization...")
         logger.info(f"Python version: {sys.version}")
@@ -88,7 +198,7 @@ def initialize_components():
         # Try to initialize ChatBridge
         logger.info("Creating ChatBridge instance...")
         try:
-            chat_bridge = ChatBridge(weaver)
+            chat_bridge = get_chat_bridge(weaver)
             logger.info("ChatBridge initialized successfully")
         except Exception as bridge_error:
             logger.error(f"ChatBridge initialization failed: {bridge_error}", exc_info=True)
@@ -119,20 +229,85 @@ except Exception as e:
 # Decorator to check if weaver is initialized
 def require_weaver(func):
     """Decorator to ensure weaver is initialized before calling endpoint"""
-    def wrapper(*args, **kwargs):
+    def check():
         if not weaver:
             logger.error(f"Weaver not initialized when {func.__name__} was called")
             raise HTTPException(
                 status_code=503,
                 detail=f"Service unavailable: Weaver not initialized. Error: {init_error[:500] if init_error else 'Unknown error during initialization'}"
             )
+
+    # functools.wraps keeps the endpoint signature visible to FastAPI, and the
+    # wrapper must stay a coroutine function for async endpoints
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            check()
+            return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        check()
         return func(*args, **kwargs)
-    wrapper.__name__ = func.__name__
     return wrapper
 
-# In-Memory Session Storage (Could be moved to file as well for persistence)
-# We will now use this only for active sessions, but persist them on creation/update
-sessions_db: Dict[str, Dict] = {}
+# In-Memory Session Storage: active sessions only, tagged by canvas and expired
+# when idle. Chat history is persisted separately by the Weaver.
+sessions_db = SessionStore()
+
+def _is_image_header(head: bytes) -> bool:
+    """
+    Sniffs common raster formats from the first bytes of an upload. SVG is
+    refused: thumbnails are served same-origin, so its scripts would run.
+    """
+    return (
+        head.startswith((b"\x89PNG\r\n\x1a\n", b"\xff\xd8\xff", b"GIF87a", b"GIF89a", b"BM",
+                         b"II*\x00", b"MM\x00*", b"\x00\x00\x01\x00"))
+        or (head[:4] == b"RIFF" and head[8:12] == b"WEBP")
+        or (head[4:8] == b"ftyp" and head[8:12] in IMAGE_FTYP_BRANDS)
+    )
+
+async def _save_image_upload(upload: UploadFile, path: Path) -> int:
+    """
+    Writes an uploaded image to path without holding it in memory and returns
+    its size. The header is checked against known image signatures first;
+    the rest is copied chunk by chunk from the spooled upload in a worker thread.
+    """
+    head = await upload.read(512)
+    if not _is_image_header(head):
+        raise HTTPException(status_code=400, detail="File must be an image")
+
+    def copy() -> int:
+        with open(path, 'wb') as f:
+            f.write(head)
+            shutil.copyfileobj(upload.file, f, UPLOAD_CHUNK_SIZE)
+            return f.tell()
+
+    return await asyncio.to_thread(copy)
+
+def _apply_registry_proposals(metadata: Dict[str, Any]):
+    """
+    Removes the LLM's proposed_new_topic / proposed_new_module keys from
+    metadata (so they never reach node data) and applies them to the registry.
+    """
+    topic = metadata.pop("proposed_new_topic", None)
+    if topic:
+        weaver.registry.update_structure(topic["name"], description=topic.get("description", ""))
+    module = metadata.pop("proposed_new_module", None)
+    if module:
+        weaver.registry.update_structure(module["topic"], module_name=module["name"], description=module.get("description", ""))
+
+def _suggested_links(suggestions: List[Dict[str, Any]], min_confidence: Optional[float] = None):
+    """Turns detect_relationships output into (target, justification, confidence) for add_edges."""
+    links = []
+    for link in suggestions:
+        target = link.get("target_id")
+        justification = link.get("justification")
+        confidence = link.get("confidence", 0.5)
+        if target and justification and (min_confidence is None or confidence > min_confidence):
+            links.append((target, justification, confidence))
+    return links
 
 # --- Data Models ---
 class ContextRequest(BaseModel):
@@ -148,6 +323,11 @@ class EdgeRequest(BaseModel):
     target: str
     justification: str
 
+class EdgeUpdateRequest(BaseModel):
+    # Unknown keys are dropped, so only edge attributes the app uses are stored
+    justification: Optional[str] = None
+    confidence: Optional[float] = None
+
 class EdgeSuggestionRequest(BaseModel):
     source: str
     target: str
@@ -167,11 +347,11 @@ class CanvasCreateRequest(BaseModel):
 # --- Endpoints ---
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"status": "Nexus Core Operational", "version": "2.0.4"}
 
 @app.get("/api/v2/test")
-def test_endpoint():
+async def test_endpoint():
     """Simple test endpoint that doesn't require weaver"""
     return {
         "status": "ok",
@@ -183,12 +363,8 @@ def test_endpoint():
     }
 
 @app.get("/api/v2/health")
-def health_check():
+async def health_check():
     """Health check endpoint for debugging"""
-    import os
-    import traceback
-    from core.storage_adapter import get_storage_info
-    
     health = {
         "status": "ok",
         "version": "2.0.4",
@@ -215,20 +391,20 @@ def health_check():
 
 @app.get("/api/v2/canvases")
 @require_weaver
-def list_canvases():
+async def list_canvases():
     """Returns a list of all available canvases."""
     try:
-        return weaver.canvas_registry.list_canvases()
+        return FastJSONResponse(weaver.canvas_registry.list_canvases())
     except Exception as e:
         logger.error(f"Error listing canvases: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to list canvases: {str(e)}")
 
 @app.post("/api/v2/canvases")
 @require_weaver
-def create_canvas(payload: CanvasCreateRequest):
+async def create_canvas(payload: CanvasCreateRequest):
     """Creates a new canvas."""
     try:
-        new_id = weaver.create_canvas(payload.name)
+        new_id = await weaver.create_canvas(payload.name)
         return {"status": "success", "canvas_id": new_id, "message": f"Canvas '{payload.name}' created"}
     except Exception as e:
         logger.error(f"Error creating canvas: {e}", exc_info=True)
@@ -236,12 +412,14 @@ def create_canvas(payload: CanvasCreateRequest):
 
 @app.post("/api/v2/canvases/{canvas_id}/activate")
 @require_weaver
-def activate_canvas(canvas_id: str):
+async def activate_canvas(canvas_id: str):
     """Switches the active canvas."""
     try:
-        if weaver.switch_canvas(canvas_id):
-            # When switching canvas, we need to clear session_db to avoid context mixups
-            sessions_db.clear() 
+        previous_id = weaver.active_canvas_id
+        if await weaver.switch_canvas(canvas_id):
+            # Sessions hold the old canvas's context; drop them to avoid mixups
+            if previous_id != canvas_id:
+                sessions_db.invalidate_canvas(previous_id)
             return {"status": "success", "message": f"Switched to canvas {canvas_id}"}
         raise HTTPException(status_code=404, detail="Canvas not found")
     except HTTPException:
@@ -252,10 +430,10 @@ def activate_canvas(canvas_id: str):
 
 @app.delete("/api/v2/canvases/{canvas_id}")
 @require_weaver
-def delete_canvas(canvas_id: str):
+async def delete_canvas(canvas_id: str):
     """Deletes a canvas."""
     try:
-        if weaver.delete_canvas(canvas_id):
+        if await weaver.delete_canvas(canvas_id):
             return {"status": "success", "message": "Canvas deleted"}
         raise HTTPException(status_code=400, detail="Cannot delete default canvas or canvas not found")
     except HTTPException:
@@ -264,78 +442,158 @@ def delete_canvas(canvas_id: str):
         logger.error(f"Error deleting canvas: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to delete canvas: {str(e)}")
 
+def _graph_etag() -> str:
+    """Changes whenever the active canvas or any graph state changes (Weaver.epoch)."""
+    digest = hashlib.blake2b(
+        f"{GRAPH_ETAG_SALT}|{weaver.active_canvas_id}|{weaver.epoch}".encode("utf-8"), digest_size=8
+    )
+    return f'"{digest.hexdigest()}"'
+
+async def _graph_json_chunks(nodes: List[tuple], edges: List[tuple]):
+    """
+    Yields {"nodes": [...], "edges": [...]} as JSON in GRAPH_STREAM_CHUNK-item
+    pieces, so the full document is never built in memory. Runs on the event
+    loop, where Weaver mutations also run, so attribute dicts are read safely.
+    """
+    yield b'{"nodes":['
+    for i in range(0, len(nodes), GRAPH_STREAM_CHUNK):
+        batch = fastjson.dumps([{"id": n, **attrs} for n, attrs in nodes[i:i + GRAPH_STREAM_CHUNK]])
+        yield (b"," if i else b"") + batch[1:-1]
+    yield b'],"edges":['
+    for i in range(0, len(edges), GRAPH_STREAM_CHUNK):
+        batch = fastjson.dumps([{"source": u, "target": v, **attrs} for u, v, attrs in edges[i:i + GRAPH_STREAM_CHUNK]])
+        yield (b"," if i else b"") + batch[1:-1]
+    yield b"]}"
+
+# Last fully streamed /api/v2/graph body: (etag, JSON bytes)
+_graph_body_cache = (None, b"")
+
+async def _caching_graph_chunks(etag: str, nodes: List[tuple], edges: List[tuple]):
+    """
+    Streams the graph JSON and keeps the body if the graph did not change
+    meanwhile and the body fits in GRAPH_BODY_CACHE_MAX_BYTES.
+    """
+    global _graph_body_cache
+    parts, size = [], 0
+    async for chunk in _graph_json_chunks(nodes, edges):
+        if parts is not None:
+            size += len(chunk)
+            if size <= GRAPH_BODY_CACHE_MAX_BYTES:
+                parts.append(chunk)
+            else:
+                # Too large to keep: stop holding a second copy of the body
+                parts = None
+        yield chunk
+    if parts is not None and _graph_etag() == etag:
+        _graph_body_cache = (etag, b"".join(parts))
+
 @app.get("/api/v2/graph")
-def get_full_graph():
-    """Returns the full graph for initial rendering."""
+async def get_full_graph(request: Request):
+    """
+    Returns the full graph for initial rendering, streamed. Clients that send
+    the last ETag back in If-None-Match get a 304 while the graph is unchanged;
+    others get the body cached from the last full stream at that ETag.
+    """
+    global _graph_body_cache
     if not weaver:
         raise HTTPException(status_code=503, detail="Weaver not initialized. Check server logs.")
     try:
-        nodes = []
-        for n in weaver.graph.nodes():
-            node_data = dict(weaver.graph.nodes[n])
-            # Include position if it exists
-            if "position" in node_data:
-                nodes.append({"id": n, **node_data})
-            else:
-                nodes.append({"id": n, **node_data})
-        edges = [{"source": u, "target": v, **weaver.graph.edges[u, v]} for u, v in weaver.graph.edges()]
-        return {"nodes": nodes, "edges": edges}
+        etag = _graph_etag()
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        cached_etag, body = _graph_body_cache
+        if cached_etag == etag:
+            return Response(content=body, media_type="application/json", headers=headers)
+        # A body for an older graph is never served again; free it now
+        _graph_body_cache = (None, b"")
+        # Shallow snapshots of the (id, attrs) pairs; node/edge dicts are built per chunk
+        nodes = list(weaver.graph.nodes(data=True))
+        edges = list(weaver.graph.edges(data=True))
+        return StreamingResponse(_caching_graph_chunks(etag, nodes, edges), media_type="application/json", headers=headers)
     except Exception as e:
         logger.error(f"Error getting graph: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get graph: {str(e)}")
 
+def _as_float(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TypeError(f"Expected a number, got {type(value).__name__}")
+    return float(value)
+
+async def _read_json_object(request: Request) -> Dict[str, Any]:
+    """
+    Parses a JSON object request body with core.fastjson, skipping pydantic
+    model validation for large free-form payloads. Raises 422 like FastAPI would.
+    """
+    try:
+        data = fastjson.loads(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid JSON body: {e}")
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=422, detail="Request body must be a JSON object")
+    return data
+
 @app.post("/api/v2/nodes/positions")
-def update_node_positions(positions: Dict[str, Dict[str, float]]):
+async def update_node_positions(request: Request):
     """
     Updates positions for multiple nodes.
     positions: { node_id: { x: float, y: float }, ... }
     """
+    positions = await _read_json_object(request)
+    try:
+        positions = {
+            node_id: {axis: _as_float(value) for axis, value in pos.items()}
+            for node_id, pos in positions.items()
+        }
+    except (AttributeError, TypeError):
+        raise HTTPException(status_code=422, detail="Positions must map node ids to {axis: number}")
     if weaver.update_node_positions(positions):
         return {"status": "success", "message": "Positions updated"}
     raise HTTPException(status_code=400, detail="Failed to update positions")
 
 @app.get("/api/v2/context")
 @require_weaver
-def get_context_registry():
+async def get_context_registry():
     """Returns the current hierarchy (Topics/Modules)."""
     try:
         if not hasattr(weaver, 'registry'):
             raise HTTPException(status_code=500, detail="Weaver registry not available")
-        return weaver.registry.context
+        return FastJSONResponse(weaver.registry.context)
     except Exception as e:
         logger.error(f"Error getting context: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get context: {str(e)}")
 
 @app.get("/api/v2/settings")
 @require_weaver
-def get_settings():
+async def get_settings():
     """Returns the global application settings."""
     try:
         if not hasattr(weaver, 'settings'):
             raise HTTPException(status_code=500, detail="Weaver settings not available")
-        return weaver.settings.settings
+        return FastJSONResponse(weaver.settings.settings)
     except Exception as e:
         logger.error(f"Error getting settings: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get settings: {str(e)}")
 
 @app.post("/api/v2/settings")
-def update_settings(updates: Dict[str, Any]):
+async def update_settings(request: Request):
     """Updates the global application settings."""
     if not weaver:
         raise HTTPException(status_code=503, detail="Weaver not initialized. Check server logs.")
+    updates = await _read_json_object(request)
     try:
-        weaver.settings.update_settings(updates)
+        await asyncio.to_thread(weaver.settings.update_settings, updates)
         return {"status": "success", "message": "Settings updated", "settings": weaver.settings.settings}
     except Exception as e:
         logger.error(f"Error updating settings: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to update settings: {str(e)}")
 
 @app.post("/api/v2/save")
-def manual_save():
+async def manual_save():
     """
     Manually saves all canvas data: graph, context, chat history, and settings.
     """
-    save_status = weaver.save_all()
+    save_status = await weaver.save_all()
     if save_status["errors"]:
         return {
             "status": "partial",
@@ -348,116 +606,143 @@ def manual_save():
         "save_status": save_status
     }
 
+class _ZipChunkSink:
+    """
+    Write-only, non-seekable file object for zipfile. zipfile then emits data
+    descriptors instead of seeking back, so the archive can be sent as it is built.
+    """
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
 @app.get("/api/v2/export")
-def export_canvas():
+async def export_canvas():
     """
-    Exports all canvas data as a ZIP file for backup.
-    Includes: graph, context, chat history, settings, and thumbnails.
+    Exports all canvas data as a ZIP file for backup, streamed to the client
+    as it is built. Includes: graph, context, chat history, settings, and thumbnails.
     """
-    import zipfile
-    import tempfile
-    from pathlib import Path
-    
-    # Import constants from storage_adapter
-    from core.storage_adapter import CANVASES_DIR, DATA_DIR, SETTINGS_FILE, CANVAS_INDEX_FILE, THUMBNAILS_DIR
-    
     canvas_id = weaver.active_canvas_id
     canvas_dir = Path(CANVASES_DIR) / canvas_id
     thumbnails_dir = THUMBNAILS_DIR
     
-    # Create temporary zip file
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     zip_filename = f"nexus_backup_{canvas_id}_{timestamp}.zip"
-    zip_path = Path(DATA_DIR) / zip_filename
     
-    try:
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Add graph.json
-            graph_file = canvas_dir / "graph.json"
-            if graph_file.exists():
-                zipf.write(graph_file, f"{canvas_id}/graph.json")
-            
-            # Add context.json
-            context_file = canvas_dir / "context.json"
-            if context_file.exists():
-                zipf.write(context_file, f"{canvas_id}/context.json")
-            
-            # Add chat.json
-            chat_file = canvas_dir / "chat.json"
-            if chat_file.exists():
-                zipf.write(chat_file, f"{canvas_id}/chat.json")
-            
-            # Add settings.json
-            settings_file = Path(SETTINGS_FILE)
-            if settings_file.exists():
-                zipf.write(settings_file, "settings.json")
-            
-            # Add canvas index
-            canvas_index_file = Path(CANVAS_INDEX_FILE)
-            if canvas_index_file.exists():
-                zipf.write(canvas_index_file, "canvases.json")
-            
-            # Add all thumbnails for this canvas (filter by node IDs in graph)
-            if thumbnails_dir.exists():
-                node_ids = set(weaver.graph.nodes())
-                for thumb_file in thumbnails_dir.glob("*"):
+    # Node ids and thumbnail references are read on the loop, which owns the graph
+    node_ids = set(weaver.graph.nodes())
+    # Image uploads are named {uuid}.{ext} and only referenced from the node
+    referenced = {
+        thumb.rsplit("/", 1)[-1]
+        for _, thumb in weaver.graph.nodes(data="thumbnail")
+        if isinstance(thumb, str) and thumb.startswith("/api/v2/thumbnails/")
+    }
+    metadata = {
+        "export_timestamp": datetime.now().isoformat(),
+        "canvas_id": canvas_id,
+        "canvas_name": weaver.canvas_registry.index["canvases"].get(canvas_id, {}).get("name", "Unknown"),
+        "node_count": weaver.graph.number_of_nodes(),
+        "edge_count": weaver.graph.number_of_edges(),
+        "version": "2.0.4"
+    }
+
+    def collect_entries():
+        # (path, arcname, compress_type); JSON deflates well even at level 1,
+        # images are stored as-is
+        entries = [
+            (canvas_dir / "graph.json", f"{canvas_id}/graph.json", zipfile.ZIP_DEFLATED),
+            (canvas_dir / "context.json", f"{canvas_id}/context.json", zipfile.ZIP_DEFLATED),
+            (canvas_dir / "chat.json", f"{canvas_id}/chat.json", zipfile.ZIP_DEFLATED),
+            (canvas_dir / "chat.jsonl", f"{canvas_id}/chat.jsonl", zipfile.ZIP_DEFLATED),
+            (Path(SETTINGS_FILE), "settings.json", zipfile.ZIP_DEFLATED),
+            (Path(CANVAS_INDEX_FILE), "canvases.json", zipfile.ZIP_DEFLATED),
+        ]
+        entries = [entry for entry in entries if entry[0].exists()]
+        
+        # Add all thumbnails for this canvas (filter by node IDs in graph)
+        if thumbnails_dir.exists():
+            with os.scandir(thumbnails_dir) as it:
+                for entry in it:
                     # Check if thumbnail belongs to any node in current canvas
                     # Thumbnail format: {node_id}_{uuid}.{ext}
-                    if any(node_id in thumb_file.stem for node_id in node_ids):
-                        zipf.write(thumb_file, f"thumbnails/{thumb_file.name}")
-            
-            # Add metadata file
-            metadata = {
-                "export_timestamp": datetime.now().isoformat(),
-                "canvas_id": canvas_id,
-                "canvas_name": weaver.canvas_registry.index["canvases"].get(canvas_id, {}).get("name", "Unknown"),
-                "node_count": len(weaver.graph.nodes()),
-                "edge_count": len(weaver.graph.edges()),
-                "version": "2.0.4"
-            }
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as tmp:
-                json.dump(metadata, tmp, indent=2)
-                tmp.flush()
-                zipf.write(tmp.name, "metadata.json")
-                os.unlink(tmp.name)
-        
-        logger.info(f"Exported canvas {canvas_id} to {zip_filename}")
-        return FileResponse(
-            zip_path,
-            media_type="application/zip",
-            filename=zip_filename,
-            headers={"Content-Disposition": f"attachment; filename={zip_filename}"}
-        )
+                    name = entry.name
+                    if name in referenced or os.path.splitext(name)[0].rsplit("_", 1)[0] in node_ids:
+                        if entry.is_file():
+                            entries.append((entry.path, f"thumbnails/{name}", zipfile.ZIP_STORED))
+        return entries, fastjson.dumps(metadata, indent=True)
+
+    try:
+        # Fold pending WAL deltas into graph.json so the backup is complete
+        await weaver.compact_async()
+        entries, metadata_bytes = await asyncio.to_thread(collect_entries)
     except Exception as e:
         logger.error(f"Export failed: {e}")
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
+    def zip_chunks():
+        sink = _ZipChunkSink()
+        try:
+            with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zipf:
+                for path, arcname, compress_type in entries:
+                    zipf.write(path, arcname, compress_type=compress_type)
+                    yield sink.drain()
+                zipf.writestr("metadata.json", metadata_bytes)
+            yield sink.drain()
+            logger.info(f"Exported canvas {canvas_id} as {zip_filename}")
+        except Exception as e:
+            # Headers are already sent; the client sees a truncated archive
+            logger.error(f"Export failed mid-stream: {e}")
+            raise
+
+    return StreamingResponse(
+        zip_chunks(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={zip_filename}"}
+    )
+
 @app.post("/api/v2/ingest/text")
 @require_weaver
 async def ingest_text(payload: TextIngestRequest):
     """
     Ingests raw text or a YouTube URL.
     """
+    candidates_ready = None
     try:
-        start_time = datetime.now()
         content = payload.content.strip()
         logger.info(f"Received ingest_text request: content length={len(content)}")
         
-        # Check for YouTube URL
-        is_youtube = content.startswith("https://www.youtube.com/") or content.startswith("https://youtu.be/")
+        # Check for YouTube / web URL
+        url_match = URL_KIND_RE.match(content)
+        is_youtube = bool(url_match and url_match.group("youtube"))
         
         node_title = "Text Note"
         final_content = content
         
+        # Embed auto-link candidates while the page is scraped / video and metadata analysed
+        candidates_ready = asyncio.ensure_future(
+            chat_bridge.prepare_relationship_candidates(weaver.get_node_summaries())
+        ) if chat_bridge and chat_bridge.auto_linking_enabled() else None
+        
         # Extract Metadata
         metadata = {} # Initialize metadata dict
         
         # 1. Try Web Scraping first if generic URL (and not YouTube)
-        if not is_youtube and (content.startswith("http://") or content.startswith("https://")):
+        if url_match and not is_youtube:
             try:
                 logger.info(f"Scraping webpage: {content}")
                 from core.scraper import scrape_webpage
-                scraped_data = scrape_webpage(content)
+                # Blocking HTTP fetch + parse; keep it off the event loop
+                scraped_data = await asyncio.to_thread(scrape_webpage, content)
                 
                 # Update content and title from scrape
                 final_content = scraped_data["content"]
@@ -487,9 +772,7 @@ async def ingest_text(payload: TextIngestRequest):
                 node_title = "Video Analysis"
                 
                 # Extract Video ID for metadata
-                import re
-                # Match standard, short, and embed URLs
-                video_id_match = re.search(r"(?:v=|\/)([0-9A-Za-z_-]{11}).*", content)
+                video_id_match = YOUTUBE_ID_RE.search(content)
                 if video_id_match:
                      metadata["video_id"] = video_id_match.group(1)
                      metadata["thumbnail"] = f"https://img.youtube.com/vi/{metadata['video_id']}/mqdefault.jpg"
@@ -515,17 +798,7 @@ async def ingest_text(payload: TextIngestRequest):
             }
         
         # --- Two-Way Interaction: Update Registry ---
-        if extracted_meta.get("proposed_new_topic"):
-            p = extracted_meta["proposed_new_topic"]
-            weaver.registry.update_structure(p["name"], description=p.get("description", ""))
-            
-        if extracted_meta.get("proposed_new_module"):
-            p = extracted_meta["proposed_new_module"]
-            weaver.registry.update_structure(p["topic"], module_name=p["name"], description=p.get("description", ""))
-        
-        # Cleanup metadata (remove proposal keys from node data)
-        extracted_meta.pop("proposed_new_topic", None)
-        extracted_meta.pop("proposed_new_module", None)
+        _apply_registry_proposals(extracted_meta)
         # ---------------------------------------------
         
         # Merge AI metadata but preserve Scraped metadata if it's better (like Title)
@@ -551,22 +824,19 @@ async def ingest_text(payload: TextIngestRequest):
         
         # Create Node ID
         # Use title as base for ID if available, else random
-        base_id = metadata.get("title", "NOTE").replace(" ", "_").upper()[:20]
-        node_id = f"{base_id}_{uuid4().hex[:4]}"
+        node_id = _new_node_id(metadata.get("title"), "NOTE")
         
         try:
             weaver.add_document_node(node_id, final_content, final_meta)
             
             # --- AUTO-LINKING ---
             try:
+                if candidates_ready:
+                    await candidates_ready
                 candidates = weaver.get_node_summaries(exclude_id=node_id)
                 current_node_summary = {"id": node_id, **final_meta}
                 suggestions = await chat_bridge.detect_relationships(current_node_summary, candidates)
-                for link in suggestions:
-                    target = link.get("target_id")
-                    justification = link.get("justification")
-                    if target and justification:
-                        weaver.add_edge(node_id, target, justification, link.get("confidence", 0.5))
+                weaver.add_edges(node_id, _suggested_links(suggestions))
             except Exception as e:
                 logger.error(f"Auto-linking failed: {e}", exc_info=True)
                 # Don't fail the entire request if auto-linking fails
@@ -585,6 +855,13 @@ async def ingest_text(payload: TextIngestRequest):
     except Exception as e:
         logger.error(f"Failed to ingest text: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Ingestion failed: {str(e)}")
+    finally:
+        # An early exit must not leave the embedding running, or its error unretrieved
+        if candidates_ready is not None:
+            if not candidates_ready.done():
+                candidates_ready.cancel()
+            elif not candidates_ready.cancelled():
+                candidates_ready.exception()
 
 @app.post("/api/v2/ingest/upload")
 @require_weaver
@@ -596,25 +873,39 @@ async def upload_document(
     """
     Ingests a file (TXT/MD) and creates a node.
     """
-    start_time = datetime.now()
-    logger.info(f"[{start_time}] Received upload request: {file.filename}")
+    start_ns = time.perf_counter_ns()
+    logger.info(f"[{datetime.now()}] Received upload request: {file.filename}")
     
     try:
         filename = file.filename
         # Read content
         logger.info(f"Reading file content...")
         try:
-            content = await file.read()
-            content_str = content.decode("utf-8")
+            # Decode chunk by chunk so the raw bytes and the text never coexist in full
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            parts = []
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                parts.append(decoder.decode(chunk))
+            parts.append(decoder.decode(b"", final=True))
+            content_str = "".join(parts)
         except Exception as e:
             logger.error(f"Failed to read file: {e}")
             raise HTTPException(status_code=400, detail="Failed to read file. Ensure it is a valid text file.")
             
         logger.info(f"Read {len(content_str)} bytes. Extracting Metadata...")
         
-        # AI Metadata Extraction
+        # AI Metadata Extraction, embedding auto-link candidates meanwhile
         try:
-            metadata = await chat_bridge.extract_metadata(content_str)
+            if chat_bridge.auto_linking_enabled():
+                metadata, _ = await asyncio.gather(
+                    chat_bridge.extract_metadata(content_str),
+                    chat_bridge.prepare_relationship_candidates(weaver.get_node_summaries())
+                )
+            else:
+                metadata = await chat_bridge.extract_metadata(content_str)
             logger.info(f"Extracted Metadata: {metadata}")
         except Exception as e:
             logger.error(f"Metadata extraction failed: {e}", exc_info=True)
@@ -628,17 +919,7 @@ async def upload_document(
             }
         
         # --- Two-Way Interaction: Update Registry ---
-        if metadata.get("proposed_new_topic"):
-            p = metadata["proposed_new_topic"]
-            weaver.registry.update_structure(p["name"], description=p.get("description", ""))
-            
-        if metadata.get("proposed_new_module"):
-            p = metadata["proposed_new_module"]
-            weaver.registry.update_structure(p["topic"], module_name=p["name"], description=p.get("description", ""))
-        
-        # Cleanup metadata (remove proposal keys from node data)
-        metadata.pop("proposed_new_topic", None)
-        metadata.pop("proposed_new_module", None)
+        _apply_registry_proposals(metadata)
         # ---------------------------------------------
         
         final_meta = {
@@ -659,11 +940,7 @@ async def upload_document(
                     **final_meta
                 }
                 suggestions = await chat_bridge.detect_relationships(current_node_summary, candidates)
-                for link in suggestions:
-                    target = link.get("target_id")
-                    justification = link.get("justification")
-                    if target and justification:
-                        weaver.add_edge(node_id, target, justification, link.get("confidence", 0.5))
+                weaver.add_edges(node_id, _suggested_links(suggestions))
             except Exception as e:
                 logger.error(f"Ingestion auto-linking failed: {e}")
             # ----------------------------------------------
@@ -672,9 +949,8 @@ async def upload_document(
              logger.error(f"Weaver failed to add node: {e}")
              raise HTTPException(status_code=500, detail="Database write failed.")
         
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
-        logger.info(f"[{end_time}] Successfully created node: {node_id} (Duration: {duration}s)")
+        duration = (time.perf_counter_ns() - start_ns) / 1e9
+        logger.info(f"Successfully created node: {node_id} (Duration: {duration:.3f}s)")
         
         return {"status": "success", "node_id": node_id, "message": f"Ingested {filename}"}
     except HTTPException as he:
@@ -693,21 +969,25 @@ async def upload_image(
     """
     Ingests an image, analyzes it with AI (OCR + content analysis), and creates a node.
     """
-    start_time = datetime.now()
-    logger.info(f"[{start_time}] Received image upload request: {file.filename}")
+    start_ns = time.perf_counter_ns()
+    logger.info(f"[{datetime.now()}] Received image upload request: {file.filename}")
     
     try:
         # Validate image type
         if not file.content_type or not file.content_type.startswith('image/'):
             raise HTTPException(status_code=400, detail="File must be an image")
         
-        # Read image bytes
-        image_bytes = await file.read()
-        logger.info(f"Read {len(image_bytes)} bytes of image data")
+        # Generate unique filename (THUMBNAILS_DIR is created at startup)
+        thumbnail_filename = _thumbnail_filename(file.filename)
+        thumbnail_path = THUMBNAILS_DIR / thumbnail_filename
+        
+        # Stream the upload straight to its thumbnail file; analysis reads it from disk
+        size = await _save_image_upload(file, thumbnail_path)
+        logger.info(f"Saved {size} bytes of image data to {thumbnail_filename}")
         
         # Analyze image with AI
         logger.info("Analyzing image with Gemini Vision API...")
-        analysis_result = await chat_bridge.analyze_image(image_bytes, file.content_type)
+        analysis_result = await chat_bridge.analyze_image(thumbnail_path, file.content_type)
         logger.info(f"Image analysis complete: {analysis_result.get('title', 'Unknown')}")
         
         # Extract content and metadata
@@ -719,42 +999,12 @@ async def upload_image(
             "module": analysis_result.get("module", "General"),
             "main_topic": analysis_result.get("main_topic", "Uncategorized"),
             "type": "Image",
-            "thumbnail": None  # Will be set after saving
+            # Relative path served by the thumbnails endpoint
+            "thumbnail": f"/api/v2/thumbnails/{thumbnail_filename}"
         }
         
-        # Save image to disk and set thumbnail path
-        import base64
-        from pathlib import Path
-        from core.storage_adapter import THUMBNAILS_DIR
-        
-        # Use storage adapter for thumbnails
-        thumbnails_dir = THUMBNAILS_DIR
-        thumbnails_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Generate unique filename
-        file_ext = file.filename.split('.')[-1] if '.' in file.filename else 'png'
-        thumbnail_filename = f"{uuid4().hex}.{file_ext}"
-        thumbnail_path = thumbnails_dir / thumbnail_filename
-        
-        # Save image
-        with open(thumbnail_path, 'wb') as f:
-            f.write(image_bytes)
-        
-        # Set thumbnail path (relative to serve from backend)
-        metadata["thumbnail"] = f"/api/v2/thumbnails/{thumbnail_filename}"
-        
         # --- Two-Way Interaction: Update Registry ---
-        if analysis_result.get("proposed_new_topic"):
-            p = analysis_result["proposed_new_topic"]
-            weaver.registry.update_structure(p["name"], description=p.get("description", ""))
-            
-        if analysis_result.get("proposed_new_module"):
-            p = analysis_result["proposed_new_module"]
-            weaver.registry.update_structure(p["topic"], module_name=p["name"], description=p.get("description", ""))
-        
-        # Cleanup metadata
-        analysis_result.pop("proposed_new_topic", None)
-        analysis_result.pop("proposed_new_module", None)
+        _apply_registry_proposals(analysis_result)
         # ---------------------------------------------
         
         # Override with form values if provided
@@ -765,8 +1015,7 @@ async def upload_image(
         }
         
         # Create Node ID
-        base_id = metadata.get("title", "IMAGE").replace(" ", "_").upper()[:20]
-        node_id = f"{base_id}_{uuid4().hex[:4]}"
+        node_id = _new_node_id(metadata.get("title"), "IMAGE")
         
         # Add to graph
         try:
@@ -777,11 +1026,7 @@ async def upload_image(
                 candidates = weaver.get_node_summaries(exclude_id=node_id)
                 current_node_summary = {"id": node_id, **final_meta}
                 suggestions = await chat_bridge.detect_relationships(current_node_summary, candidates)
-                for link in suggestions:
-                    target = link.get("target_id")
-                    justification = link.get("justification")
-                    if target and justification:
-                        weaver.add_edge(node_id, target, justification, link.get("confidence", 0.5))
+                weaver.add_edges(node_id, _suggested_links(suggestions))
             except Exception as e:
                 logger.error(f"Auto-linking failed: {e}")
             # --------------------
@@ -790,9 +1035,8 @@ async def upload_image(
             logger.error(f"Failed to add image node: {e}")
             raise HTTPException(status_code=500, detail=str(e))
         
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
-        logger.info(f"[{end_time}] Successfully created image node: {node_id} (Duration: {duration}s)")
+        duration = (time.perf_counter_ns() - start_ns) / 1e9
+        logger.info(f"Successfully created image node: {node_id} (Duration: {duration:.3f}s)")
         
         return {"status": "success", "node_id": node_id, "message": f"Image analyzed and ingested"}
     except HTTPException as he:
@@ -801,23 +1045,14 @@ async def upload_image(
         logger.error(f"Unexpected Image Upload Error: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/v2/thumbnails/{filename}")
-async def get_thumbnail(filename: str):
-    """
-    Serves thumbnail images.
-    """
-    from fastapi.responses import FileResponse
-    from pathlib import Path
-    from core.storage_adapter import THUMBNAILS_DIR
-    
-    thumbnail_path = THUMBNAILS_DIR / filename
-    if not thumbnail_path.exists():
-        raise HTTPException(status_code=404, detail="Thumbnail not found")
-    
-    return FileResponse(thumbnail_path)
+# Serves thumbnail images. StaticFiles streams them with ETag/Last-Modified and
+# Range support and rejects paths that escape the directory. Thumbnails are
+# written at runtime (under /tmp on Vercel), so they cannot be build output.
+THUMBNAILS_DIR.mkdir(parents=True, exist_ok=True)
+app.mount("/api/v2/thumbnails", StaticFiles(directory=str(THUMBNAILS_DIR)), name="thumbnails")
 
 @app.post("/api/v2/ingest/edge")
-def create_edge(payload: EdgeRequest):
+async def create_edge(payload: EdgeRequest):
     """
     Manually creates a justified edge between nodes.
     """
@@ -827,16 +1062,16 @@ def create_edge(payload: EdgeRequest):
     return {"status": "success", "message": "Edge created"}
 
 @app.put("/api/v2/edges")
-def update_edge(source: str, target: str, updates: Dict[str, Any]):
+async def update_edge(source: str, target: str, payload: EdgeUpdateRequest):
     """
     Updates edge attributes (e.g. justification).
     """
-    if not weaver.update_edge(source, target, updates):
+    if not weaver.update_edge(source, target, payload.model_dump(exclude_none=True)):
         raise HTTPException(status_code=404, detail="Edge not found")
     return {"status": "success", "message": "Edge updated"}
 
 @app.delete("/api/v2/edges")
-def delete_edge(source: str, target: str):
+async def delete_edge(source: str, target: str):
     if not weaver.delete_edge(source, target):
         raise HTTPException(status_code=404, detail="Edge not found")
     logger.info(f"Deleted edge: {source} -> {target}")
@@ -861,12 +1096,10 @@ async def expand_node(node_id: str, payload: ExpansionRequest):
     created_nodes = []
     
     if payload.direction == "down":
-        # Generate breakdown
-        suggestions = await chat_bridge.generate_mece_breakdown(node_id)
-        
-        for item in suggestions:
+        # Generate breakdown; each sub-node is created as soon as it streams in
+        async for item in chat_bridge.generate_mece_breakdown(node_id):
             # Create new node
-            new_id = f"{item.get('title', 'SUB').replace(' ', '_').upper()[:15]}_{uuid4().hex[:4]}"
+            new_id = _new_node_id(item.get('title'), "SUB", max_slug=15)
             meta = {
                 "title": item.get("title"),
                 "summary": item.get("summary"),
@@ -889,7 +1122,7 @@ async def expand_node(node_id: str, payload: ExpansionRequest):
         # Generate abstraction
         item = await chat_bridge.generate_abstraction(node_id)
         if item:
-            new_id = f"{item.get('title', 'PARENT').replace(' ', '_').upper()[:15]}_{uuid4().hex[:4]}"
+            new_id = _new_node_id(item.get('title'), "PARENT", max_slug=15)
             meta = {
                 "title": item.get("title"),
                 "summary": item.get("summary"),
@@ -952,22 +1185,18 @@ async def analyze_node(node_id: str):
     
     logger.info(f"Extracting metadata for content length: {len(content)}")
     
-    # Extract Metadata
-    metadata = await chat_bridge.extract_metadata(content)
+    # Extract Metadata, embedding auto-link candidates meanwhile
+    if chat_bridge.auto_linking_enabled():
+        metadata, _ = await asyncio.gather(
+            chat_bridge.extract_metadata(content),
+            chat_bridge.prepare_relationship_candidates(weaver.get_node_summaries(exclude_id=node_id))
+        )
+    else:
+        metadata = await chat_bridge.extract_metadata(content)
     logger.info(f"AI returned metadata: {metadata}")
     
     # --- Two-Way Interaction: Update Registry ---
-    if metadata.get("proposed_new_topic"):
-        p = metadata["proposed_new_topic"]
-        weaver.registry.update_structure(p["name"], description=p.get("description", ""))
-        
-    if metadata.get("proposed_new_module"):
-        p = metadata["proposed_new_module"]
-        weaver.registry.update_structure(p["topic"], module_name=p["name"], description=p.get("description", ""))
-    
-    # Cleanup metadata
-    metadata.pop("proposed_new_topic", None)
-    metadata.pop("proposed_new_module", None)
+    _apply_registry_proposals(metadata)
     # ---------------------------------------------
     
     # Update Node
@@ -976,11 +1205,8 @@ async def analyze_node(node_id: str):
     # Logic: If current is Default, overwrite. If AI suggests something new, overwrite.
     # Current implementation: Just overwrite with AI's best guess for now.
     
-    # Update NetworkX graph
-    for key, value in updates.items():
-        weaver.graph.nodes[node_id][key] = value
-        
-    weaver.save_graph()
+    # Update NetworkX graph (logged as a WAL delta, not a full snapshot)
+    weaver.update_node(node_id, updates)
     logger.info(f"Graph updated and saved for node {node_id}")
     
     # --- AUTO-LINKING LOGIC ---
@@ -996,15 +1222,7 @@ async def analyze_node(node_id: str):
         }
         suggestions = await chat_bridge.detect_relationships(current_node_summary, candidates)
         
-        edges_created = 0
-        for link in suggestions:
-            target = link.get("target_id")
-            justification = link.get("justification")
-            confidence = link.get("confidence", 0.5)
-            
-            if target and justification and confidence > 0.6: 
-                if weaver.add_edge(node_id, target, justification, confidence):
-                    edges_created += 1
+        edges_created = weaver.add_edges(node_id, _suggested_links(suggestions, min_confidence=0.6))
         
         if edges_created > 0:
             logger.info(f"Auto-linked {node_id} to {edges_created} nodes.")
@@ -1021,7 +1239,7 @@ async def analyze_node(node_id: str):
     }
 
 @app.delete("/api/v2/nodes/{node_id}")
-def delete_node(node_id: str):
+async def delete_node(node_id: str):
     if not weaver.delete_node(node_id):
         raise HTTPException(status_code=404, detail="Node not found")
     logger.info(f"Deleted node: {node_id}")
@@ -1056,28 +1274,18 @@ async def update_node(
             if not thumbnail.content_type or not thumbnail.content_type.startswith('image/'):
                 raise HTTPException(status_code=400, detail="File must be an image")
             
-            # Read image bytes
-            image_bytes = await thumbnail.read()
-            
-            # Save thumbnail
-            from pathlib import Path
-            from core.storage_adapter import THUMBNAILS_DIR
-            
-            thumbnails_dir = THUMBNAILS_DIR
-            thumbnails_dir.mkdir(parents=True, exist_ok=True)
+            # Generate unique filename, prefixed with the node id for export
+            thumbnail_filename = _thumbnail_filename(thumbnail.filename, prefix=f"{node_id}_")
+            thumbnail_path = THUMBNAILS_DIR / thumbnail_filename
             
-            # Generate unique filename
-            file_ext = thumbnail.filename.split('.')[-1] if '.' in thumbnail.filename else 'png'
-            thumbnail_filename = f"{node_id}_{uuid4().hex[:8]}.{file_ext}"
-            thumbnail_path = thumbnails_dir / thumbnail_filename
-            
-            # Save image
-            with open(thumbnail_path, 'wb') as f:
-                f.write(image_bytes)
+            # Save image, streamed from the spooled upload
+            await _save_image_upload(thumbnail, thumbnail_path)
             
             # Update node with thumbnail path
             updates["thumbnail"] = f"/api/v2/thumbnails/{thumbnail_filename}"
             logger.info(f"Thumbnail uploaded for node {node_id}: {thumbnail_filename}")
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Failed to upload thumbnail: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to upload thumbnail: {str(e)}")
@@ -1113,15 +1321,8 @@ async def update_node(
         node_data = dict(weaver.graph.nodes[node_id])
         return {"status": "success", "message": "No updates provided", "node": node_data}
 
-@app.delete("/api/v2/edges")
-def delete_edge(source: str, target: str):
-    if not weaver.delete_edge(source, target):
-        raise HTTPException(status_code=404, detail="Edge not found")
-    logger.info(f"Deleted edge: {source} -> {target}")
-    return {"status": "success", "message": "Edge deleted"}
-
 @app.post("/api/v2/chat/context")
-def calculate_context(payload: ContextRequest):
+async def calculate_context(payload: ContextRequest):
     depth_map = {"F0": 0, "F1": 1, "F2": 2}
     depth = depth_map.get(payload.depth_mode, 0)
     
@@ -1142,7 +1343,7 @@ def calculate_context(payload: ContextRequest):
         "dominant_module": context_data["dominant_module"]
     }
     
-    sessions_db[session_id] = new_session
+    sessions_db.put(session_id, new_session, weaver.active_canvas_id)
     
     return {
         "session_id": session_id,
@@ -1151,45 +1352,77 @@ def calculate_context(payload: ContextRequest):
         "dominant_module": context_data["dominant_module"]
     }
 
-@app.post("/api/v2/chat/message")
-async def send_message(payload: ChatMessageRequest):
+def _chat_message(role: str, content: str) -> Dict[str, str]:
+    # 96 random bits is plenty for ids scoped to one session's messages
+    return {
+        "id": secrets.token_urlsafe(12),
+        "role": role,
+        "content": content,
+        "timestamp": datetime.now().isoformat()
+    }
+
+def _start_chat_turn(payload: ChatMessageRequest) -> Dict:
+    """Looks up the session and records the user message."""
     session = sessions_db.get(payload.session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
         
-    user_msg = {
-        "id": str(uuid4()),
-        "role": "user",
-        "content": payload.user_prompt,
-        "timestamp": datetime.now().isoformat()
-    }
-    session["messages"].append(user_msg)
+    session["messages"].append(_chat_message("user", payload.user_prompt))
+    return session
+
+def _finish_chat_turn(session_id: str, session: Dict, response_text: str) -> Dict:
+    """Records the assistant message and persists the chat history."""
+    assistant_msg = _chat_message("assistant", response_text)
+    session["messages"].append(assistant_msg)
+    
+    # Autosave chat history (PERSISTENCE): append this turn's user and assistant messages
+    weaver.append_chat_messages(session_id, session["messages"][-2:])
+    return assistant_msg
+
+@app.post("/api/v2/chat/message")
+async def send_message(payload: ChatMessageRequest):
+    session = _start_chat_turn(payload)
     
     response_text = await chat_bridge.generate_response(
+        payload.session_id,
         session["messages"][:-1], 
         session["context_data"],
         payload.user_prompt
     )
     
-    assistant_msg = {
-        "id": str(uuid4()),
-        "role": "assistant",
-        "content": response_text,
-        "timestamp": datetime.now().isoformat()
-    }
-    session["messages"].append(assistant_msg)
+    return _finish_chat_turn(payload.session_id, session, response_text)
+
+@app.post("/api/v2/chat/message/stream")
+async def stream_message(payload: ChatMessageRequest):
+    """
+    Same as /chat/message, but streams the assistant reply as plain text chunks.
+    The full reply is persisted once the stream completes.
+    """
+    session = _start_chat_turn(payload)
     
-    # Autosave chat history (PERSISTENCE)
-    # We update the internal history of Weaver which writes to disk
-    weaver.chat_history.append({"session_id": payload.session_id, "messages": session["messages"]})
-    weaver.save_chat_history(weaver.chat_history)
+    async def reply_chunks():
+        chunks = []
+        async for chunk in chat_bridge.stream_response(
+            payload.session_id,
+            session["messages"][:-1],
+            session["context_data"],
+            payload.user_prompt
+        ):
+            chunks.append(chunk)
+            yield chunk
+        _finish_chat_turn(payload.session_id, session, "".join(chunks))
     
-    return assistant_msg
+    return StreamingResponse(reply_chunks(), media_type="text/plain; charset=utf-8")
 
 @app.get("/api/v2/chat/history/{session_id}")
-def get_history(session_id: str):
+async def get_history(session_id: str):
+    # Returned as FastJSONResponse directly: the session is plain JSON data, so
+    # FastAPI's per-item jsonable_encoder pass over every message is skipped
     session = sessions_db.get(session_id)
     if not session:
-        # Check if we can hydrate from persistent storage (optional enhancement)
-        raise HTTPException(status_code=404, detail="Session not found")
-    return session
+        # Fall back to the messages persisted for the active canvas
+        messages = weaver.get_chat_messages(session_id) if weaver else None
+        if messages is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        return FastJSONResponse({"session_id": session_id, "messages": messages})
+    return FastJSONResponse(session)